@@ -0,0 +1,48 @@
+"""Compares the backpressure policies of `post_log` against a UI loop slower than its producers.
+
+Run from the repository root:
+    python benchmarks/bench_backpressure.py
+"""
+
+import threading
+import time
+
+from headless import make_console
+from snapconsole import LogBackpressure
+
+
+def bench_policy(backpressure, threads, logs_per_thread, max_pending=1000, ui_delay=0.02, height=50, width=120):
+    console = make_console(height, width, max_fps=60, max_pending_logs=max_pending, log_backpressure=backpressure)
+
+    def produce(thread_index):
+        for i in range(logs_per_thread):
+            console.post_log(f'Thread {thread_index} log {i}: ' + 'lorem ipsum ' * 5)
+
+    workers = [threading.Thread(target=produce, args=(i,)) for i in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    # Stands in for a UI loop that spends `ui_delay` on every iteration
+    while any(worker.is_alive() for worker in workers):
+        console._drain_posted_logs()
+        console._redraw_scheduler.maybe_flush()
+        time.sleep(ui_delay)
+    elapsed = time.perf_counter() - start
+    console.flush()
+    return elapsed, console.log_queue
+
+
+def main(threads=4, logs_per_thread=50000):
+    total = threads * logs_per_thread
+    print(f'{"policy":>12} {"posts/s":>10} {"peak":>8} {"dropped":>8} {"blocked":>8}')
+    policies = [('unbounded', None)] + [(policy.value, policy) for policy in LogBackpressure]
+    for name, policy in policies:
+        if policy is None:
+            elapsed, queue = bench_policy(LogBackpressure.DROP_OLDEST, threads, logs_per_thread, max_pending=None)
+        else:
+            elapsed, queue = bench_policy(policy, threads, logs_per_thread)
+        print(f'{name:>12} {total / elapsed:>10.0f} {queue.peak_pending:>8} {queue.dropped_count:>8} {queue.blocked_count:>8}')
+
+
+if __name__ == '__main__':
+    main()
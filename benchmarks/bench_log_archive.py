@@ -0,0 +1,45 @@
+"""Measures memory and scrollback frame times with and without a log archive.
+
+Run from the repository root:
+    python benchmarks/bench_log_archive.py
+"""
+
+import time
+import tracemalloc
+
+from headless import make_console
+from snapconsole import LogArchive
+
+
+def measure(count, **kwargs):
+    tracemalloc.start()
+    console = make_console(50, 120, max_fps=None, **kwargs)
+    for i in range(0, count, 1000):
+        with console.batch():
+            for j in range(i, i + 1000):
+                console.logs.append(f'Log entry {j}: ' + 'lorem ipsum ' * (j % 10))
+        console.flush()
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    jumps = 200
+    for i in range(jumps):
+        # Jump around the whole session, most of which is in the archive
+        console.scroll_offset = (i * 7919) % (count * 2)
+        console.flush()
+    return memory, (time.perf_counter() - start) / jumps
+
+
+def main():
+    for count in (100000, 500000):
+        memory, frame_time = measure(count)
+        print(f'{count:>7} logs in memory:   {memory / 2**20:7.1f}MiB, {frame_time * 1e3:6.2f}ms per scrollback frame')
+        archive = LogArchive()
+        memory, frame_time = measure(count, max_logs=10000, log_archive=archive)
+        archive.close()
+        print(f'{count:>7} logs, archived:   {memory / 2**20:7.1f}MiB, {frame_time * 1e3:6.2f}ms per scrollback frame')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+"""Measures filtering a large log backlog.
+
+Run from the repository root:
+    python benchmarks/bench_log_filter.py
+"""
+
+import time
+
+from headless import make_console
+
+
+def timed(action):
+    start = time.perf_counter()
+    action()
+    return (time.perf_counter() - start) * 1e3
+
+
+def bench(log_filter, entry_count=500000):
+    console = make_console(50, 120, max_fps=None)
+    console.logs += [f'Log entry {i}: level={"ERROR" if i % 1000 == 0 else "INFO"}' for i in range(entry_count)]
+    console.flush()
+
+    def set_filter():
+        console.set_log_filter(log_filter)
+        console.flush()
+    first_frame = timed(set_filter)
+
+    def append_and_draw():
+        for i in range(100):
+            console.logs.append(f'Appended {i}: level=INFO')
+            console.flush()
+    append_frame = timed(append_and_draw) / 100
+
+    def count_hidden():
+        while console._check_log_filter():
+            pass
+    count_time = timed(count_hidden)
+    print(
+        f'{log_filter!r:>12}: first frame {first_frame:7.1f}ms, frame after append {append_frame:5.2f}ms, '
+        f'counted {console.hidden_log_count} hidden in {count_time:.0f}ms'
+    )
+
+
+def main():
+    bench('INFO')
+    bench('ERROR')
+    bench('level=NONE')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""Compares a reader thread appending a subprocess's output line by line with `ProcessSource`.
+
+Run from the repository root:
+    python benchmarks/bench_log_sources.py
+"""
+
+import asyncio
+import subprocess
+import sys
+import threading
+import time
+
+from headless import make_console
+from snapconsole import ProcessSource
+
+PRODUCER = 'for i in range({}): print(f"Worker log {{i}}: " + "lorem ipsum " * 5)'
+
+
+def bench_reader_thread(line_count, height=50, width=120):
+    console = make_console(height, width, max_fps=None)
+    lock = threading.Lock()
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, '-c', PRODUCER.format(line_count)], stdout=subprocess.PIPE, text=True
+    )
+
+    def read():
+        for line in process.stdout:
+            with lock:
+                console.logs.append(line.rstrip('\n'))
+
+    reader = threading.Thread(target=read)
+    reader.start()
+    reader.join()
+    process.wait()
+    elapsed = time.perf_counter() - start
+    return elapsed, console._redraw_scheduler.frames_drawn, len(console.logs)
+
+
+def bench_process_source(line_count, height=50, width=120):
+    console = make_console(height, width, max_fps=60)
+
+    async def run():
+        source = console.attach_source(ProcessSource(sys.executable, '-c', PRODUCER.format(line_count)))
+        while source.process is None or source.process.returncode is None or len(console.logs) < line_count:
+            await asyncio.sleep(0.001)
+        console.flush()
+
+    start = time.perf_counter()
+    asyncio.run(run())
+    elapsed = time.perf_counter() - start
+    return elapsed, console._redraw_scheduler.frames_drawn, len(console.logs)
+
+
+def main(line_count=50000):
+    print(f'{"method":>15} {"lines/s":>10} {"frames":>8} {"logs":>8}')
+    for name, bench in (('reader thread', bench_reader_thread), ('ProcessSource', bench_process_source)):
+        elapsed, frames, logs = bench(line_count)
+        print(f'{name:>15} {line_count / elapsed:>10.0f} {frames:>8} {logs:>8}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+"""Compares keeping the logs bounded by slicing with the `max_logs` ring buffer.
+
+Run from the repository root:
+    python benchmarks/bench_log_store.py
+"""
+
+import time
+
+from headless import make_console
+
+
+def bench_slicing(appends, bound):
+    console = make_console(50, 120)
+    start = time.perf_counter()
+    with console.batch():
+        for i in range(appends):
+            console.logs.append(f'Log entry {i}')
+            console.logs = console.logs[-bound:]
+    return time.perf_counter() - start
+
+
+def bench_max_logs(appends, bound):
+    console = make_console(50, 120, max_logs=bound)
+    start = time.perf_counter()
+    with console.batch():
+        for i in range(appends):
+            console.logs.append(f'Log entry {i}')
+    return time.perf_counter() - start
+
+
+def main():
+    appends = 20000
+    print(f'{"bound":>8} {"slicing appends/s":>18} {"max_logs appends/s":>19}')
+    for bound in (1000, 5000, 20000):
+        slicing = bench_slicing(appends, bound)
+        max_logs = bench_max_logs(appends, bound)
+        print(f'{bound:>8} {appends / slicing:>18.0f} {appends / max_logs:>19.0f}')
+
+
+if __name__ == '__main__':
+    main()
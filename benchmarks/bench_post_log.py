@@ -0,0 +1,62 @@
+"""Compares appending logs from worker threads under a lock with posting them to the console.
+
+Run from the repository root:
+    python benchmarks/bench_post_log.py
+"""
+
+import threading
+import time
+
+from headless import make_console
+
+
+def run_producers(post, threads, logs_per_thread):
+    def produce(thread_index):
+        for i in range(logs_per_thread):
+            post(f'Thread {thread_index} log {i}: ' + 'lorem ipsum ' * 5)
+
+    workers = [threading.Thread(target=produce, args=(i,)) for i in range(threads)]
+    for worker in workers:
+        worker.start()
+    return workers
+
+
+def bench_locked_append(threads, logs_per_thread, height=50, width=120):
+    console = make_console(height, width, max_fps=None)
+    lock = threading.Lock()
+
+    def post(entry):
+        with lock:
+            console.logs.append(entry)
+
+    start = time.perf_counter()
+    for worker in run_producers(post, threads, logs_per_thread):
+        worker.join()
+    elapsed = time.perf_counter() - start
+    return elapsed, console._redraw_scheduler.frames_drawn, len(console.logs)
+
+
+def bench_post_log(threads, logs_per_thread, height=50, width=120):
+    console = make_console(height, width, max_fps=60)
+    start = time.perf_counter()
+    workers = run_producers(console.post_log, threads, logs_per_thread)
+    # Stands in for the UI loop, which drains the queue once per iteration
+    while any(worker.is_alive() for worker in workers):
+        console._drain_posted_logs()
+        console._redraw_scheduler.maybe_flush()
+        time.sleep(0.001)
+    console.flush()
+    elapsed = time.perf_counter() - start
+    return elapsed, console._redraw_scheduler.frames_drawn, len(console.logs)
+
+
+def main(threads=4, logs_per_thread=5000):
+    total = threads * logs_per_thread
+    print(f'{"method":>14} {"logs/s":>10} {"frames":>8} {"logs":>8}')
+    for name, bench in (('locked append', bench_locked_append), ('post_log', bench_post_log)):
+        elapsed, frames, logs = bench(threads, logs_per_thread)
+        print(f'{name:>14} {total / elapsed:>10.0f} {frames:>8} {logs:>8}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,30 @@
+"""Compares redrawing on every log append with coalescing redraws into frames.
+
+Run from the repository root:
+    python benchmarks/bench_redraw.py
+"""
+
+import time
+
+from headless import make_console
+
+
+def bench(max_fps, appends=10000, height=50, width=120):
+    console = make_console(height, width, max_fps=max_fps)
+    start = time.perf_counter()
+    for i in range(appends):
+        console.logs.append(f'Log entry {i}: ' + 'lorem ipsum ' * 5)
+    console.flush()
+    elapsed = time.perf_counter() - start
+    return elapsed, console._redraw_scheduler.frames_drawn
+
+
+def main():
+    print(f'{"max_fps":>8} {"appends/s":>12} {"frames":>8}')
+    for max_fps in (None, 60, 30):
+        elapsed, frames = bench(max_fps)
+        print(f'{str(max_fps):>8} {10000 / elapsed:>12.0f} {frames:>8}')
+
+
+if __name__ == '__main__':
+    main()
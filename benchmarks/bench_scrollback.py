@@ -0,0 +1,39 @@
+"""Measures scrolling back through a long log history.
+
+Run from the repository root:
+    python benchmarks/bench_scrollback.py
+"""
+
+import random
+import time
+
+from headless import make_console
+
+
+def main():
+    entry_count = 100000
+    console = make_console(40, 120, max_fps=None)
+    console.logs += [f'Log entry {i}: ' + 'lorem ipsum ' * (i % 20) for i in range(entry_count)]
+
+    start = time.perf_counter()
+    console.scroll_logs(1)
+    console.flush()
+    print(f'index {entry_count} logs: {time.perf_counter() - start:.2f}s')
+
+    random.seed(0)
+    jumps = 2000
+    start = time.perf_counter()
+    for _ in range(jumps):
+        console.scroll_offset = random.randrange(entry_count)
+        console.flush()
+    print(f'random jumps: {(time.perf_counter() - start) / jumps * 1e6:.0f}us per frame')
+
+    start = time.perf_counter()
+    for _ in range(jumps):
+        console.logs.append('New log entry')
+        console.flush()
+    print(f'appends while scrolled back: {(time.perf_counter() - start) / jumps * 1e6:.0f}us per frame')
+
+
+if __name__ == '__main__':
+    main()
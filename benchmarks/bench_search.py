@@ -0,0 +1,56 @@
+"""Measures searching the logs and the command history as a query is typed.
+
+Run from the repository root:
+    python benchmarks/bench_search.py
+"""
+
+import random
+import time
+
+import headless  # noqa: F401, puts the package on the path
+from snapconsole.search import TextIndex
+from snapconsole.wrappedlist import WrappedList
+
+WORDS = ['request', 'served', 'cache', 'miss', 'worker', 'started', 'timeout', 'retrying', 'user', 'login']
+
+
+def linear_find_last(entries, query):
+    query = query.lower()
+    for i in range(len(entries) - 1, -1, -1):
+        if query in entries[i].lower():
+            return i
+    return None
+
+
+def time_typing(find_last, query):
+    # Searches once per prefix of the query, like a user typing it
+    start = time.perf_counter()
+    for end in range(1, len(query) + 1):
+        find_last(query[:end])
+    return (time.perf_counter() - start) / len(query)
+
+
+def bench(name, entries, text_index, queries):
+    start = time.perf_counter()
+    text_index.sync(entries)
+    print(f'{name}: index {len(entries)} entries in {time.perf_counter() - start:.2f}s')
+    for query in queries:
+        indexed = time_typing(text_index.find_last, query)
+        linear = time_typing(lambda prefix: linear_find_last(entries, prefix), query)
+        print(f'  {query!r:>16} indexed {indexed * 1e3:7.2f}ms  linear {linear * 1e3:7.2f}ms per key')
+
+
+def main():
+    random.seed(0)
+    logs = WrappedList(lambda: None, (
+        f'[{i}] ' + ' '.join(random.choice(WORDS) for _ in range(6))
+        for i in range(1000000)
+    ))
+    command_history = WrappedList(lambda: None, (f'run job-{i} --retries {i % 7}' for i in range(100000)))
+    queries = ['worker', 'job-123', 'not in any entry']
+    bench('logs', logs, TextIndex(), queries)
+    bench('history', command_history, TextIndex(), queries)
+
+
+if __name__ == '__main__':
+    main()
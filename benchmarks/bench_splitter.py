@@ -0,0 +1,85 @@
+"""Times the default log splitter against the original implementation.
+
+tests/test_splitter.py checks that both split logs the same way.
+
+Run from the repository root:
+    python benchmarks/bench_splitter.py
+"""
+
+import curses
+import curses.ascii
+import timeit
+
+import headless  # noqa: F401 (adds src to the path)
+from snapconsole.snapconsole import default_log_splitter, split_and_keep, split_list, unicode_log_splitter
+
+
+def legacy_log_splitter(log_entry, col):
+    # The multi-pass splitter that `default_log_splitter` replaced, kept as the reference output
+    if isinstance(log_entry, str):
+        log_entry = [log_entry]
+
+    temp = []
+    for log_sub_entry in log_entry:
+        if isinstance(log_sub_entry, int):
+            temp.append(log_sub_entry)
+            continue
+        temp += split_and_keep(log_sub_entry, '\n')
+    log_entry = temp
+
+    temp = []
+    for log_sub_entry in log_entry:
+        if isinstance(log_sub_entry, int) or log_sub_entry == '\n':
+            temp.append(log_sub_entry)
+            continue
+        temp.append(''.join(filter(curses.ascii.isprint, log_sub_entry)))
+    log_entry = temp
+
+    temp = []
+    cur_line_len = 0
+    for log_sub_entry in log_entry:
+        if isinstance(log_sub_entry, int) or log_sub_entry in ('', '\n'):
+            temp.append(log_sub_entry)
+            continue
+        while len(log_sub_entry) > 0:
+            sliced_len = col - cur_line_len
+            cur_slice = log_sub_entry[:sliced_len]
+            cur_line_len += len(cur_slice)
+            temp.append(cur_slice)
+
+            log_sub_entry = log_sub_entry[sliced_len:]
+            if cur_line_len == col:
+                if len(log_sub_entry) > 0:
+                    temp.append('\n')
+                cur_line_len = 0
+    log_entry = temp
+
+    result = split_list(log_entry, '\n')
+
+    temp = []
+    for line in result:
+        temp.append(list(filter(lambda l: isinstance(l, int) or len(l) > 0, line)))
+    return temp
+
+
+def main():
+    entries = [
+        'A plain log entry that is long enough to wrap at least once on a narrow terminal ' * 2,
+        [curses.A_BOLD, 'Styled ', curses.A_NORMAL, 'log entry\nwith a new line and ', curses.A_REVERSE, 'more text' * 10],
+        'Short entry',
+        'Tabs\tand\x1b[0m escape codes get filtered out ' * 3,
+    ]
+    for name, splitter in (('legacy', legacy_log_splitter), ('default', default_log_splitter)):
+        seconds = timeit.timeit(lambda: [splitter(entry, 80) for entry in entries], number=20000)
+        print(f'{name:>8}: {20000 * len(entries) / seconds:>10.0f} entries/s')
+
+    unicode_entries = entries + [
+        '漢字とかなが混ざったログのエントリー、折り返しが必要なほど長いテキスト' * 2,
+        [curses.A_BOLD, 'Emoji 😀🎉 ', curses.A_NORMAL, 'and combining accents: e\u0301 a\u0300 ' * 4],
+    ]
+    seconds = timeit.timeit(lambda: [unicode_log_splitter(entry, 80) for entry in unicode_entries], number=20000)
+    print(f'{"unicode":>8}: {20000 * len(unicode_entries) / seconds:>10.0f} entries/s (with CJK and emoji entries)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""Compares list log entries with styled lines, for memory and frame times.
+
+Scrolling through every log measures the time to wrap logs that are not cached yet, and the memory
+still held for wrapped logs once the scroll is over.
+
+Run from the repository root:
+    python benchmarks/bench_styled_line.py
+"""
+
+import time
+import tracemalloc
+
+from headless import make_console
+from snapconsole import StyledLine
+
+
+def make_entries(count, styled):
+    entries = []
+    for i in range(count):
+        segments = ['[', 2, 'INFO', 0, f'] worker {i % 16}: ', 4, f'request {i} served', 0]
+        entries.append(StyledLine(*segments) if styled else segments)
+    return entries
+
+
+def measure_memory(count, styled):
+    tracemalloc.start()
+    entries = make_entries(count, styled)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del entries
+    return size
+
+
+def measure_frames(styled, count=100000, frames=2000):
+    console = make_console(50, 120, max_fps=None)
+    console.logs += make_entries(count, styled)
+    console.flush()
+    start = time.perf_counter()
+    for i in range(frames):
+        # Alternate between two scroll positions so every frame draws the same logs again
+        console.scroll_offset = 100 * (i % 2)
+        console.flush()
+    return (time.perf_counter() - start) / frames
+
+
+def measure_scroll(styled, count=100000, height=50):
+    console = make_console(height, 120, max_fps=None)
+    console.logs += make_entries(count, styled)
+    console.flush()
+    tracemalloc.start()
+    start = time.perf_counter()
+    pages = 0
+    for offset in range(0, count, height):
+        console.scroll_offset = offset
+        console.flush()
+        pages += 1
+    elapsed = time.perf_counter() - start
+    console.scroll_offset = 0
+    console.flush()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed / pages, retained
+
+
+def main():
+    count = 1000000
+    for styled in (False, True):
+        name = 'StyledLine' if styled else 'list'
+        memory = measure_memory(count, styled)
+        frame_time = measure_frames(styled)
+        page_time, retained = measure_scroll(styled)
+        print(
+            f'{name:>10}: {memory / count:6.0f} bytes per entry, {frame_time * 1e6:6.0f}us per frame, '
+            f'{page_time * 1e6:6.0f}us per new page, {retained / 2**20:6.1f}MiB retained after scrolling'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+"""Measures the cost of a display redraw as the number of visible log entries grows.
+
+Run from the repository root:
+    python benchmarks/bench_wrap_cache.py
+"""
+
+import time
+
+from headless import make_console
+from snapconsole.snapconsole import default_log_splitter
+
+
+class CountingSplitter:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, log_entry, col):
+        self.calls += 1
+        return default_log_splitter(log_entry, col)
+
+
+def bench(height, width=120, appends=2000):
+    # Draw on every append so each one pays for a full redraw
+    console = make_console(height, width, max_fps=None)
+    splitter = CountingSplitter()
+    console.log_splitter = splitter
+    console.logs += [f'Log entry {i}: ' + 'lorem ipsum ' * 5 for i in range(height)]
+
+    splitter.calls = 0
+    start = time.perf_counter()
+    for i in range(appends):
+        # Every append redraws the display
+        console.logs.append(f'Appended entry {i}: ' + 'dolor sit amet ' * 4)
+    elapsed = time.perf_counter() - start
+    return elapsed / appends, splitter.calls / appends
+
+
+def main():
+    print(f'{"visible rows":>12} {"us/redraw":>10} {"splits/redraw":>14}')
+    for height in (10, 25, 50, 100, 200):
+        per_redraw, splits = bench(height)
+        print(f'{height - 1:>12} {per_redraw * 1e6:>10.1f} {splits:>14.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""Minimal stand-ins for curses windows so the console can be driven without a terminal"""
+
+import curses
+import os
+import sys
+from collections import Counter, deque
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from snapconsole import SnapConsole
+from snapconsole.textbox import Textbox
+
+# Only defined by the Windows curses build, but read whenever a key is handled
+if not hasattr(curses, 'PADENTER'):
+    curses.PADENTER = 459
+# Line drawing characters are only defined once curses is initialized
+for name in ('ACS_VLINE', 'ACS_HLINE'):
+    if not hasattr(curses, name):
+        setattr(curses, name, ord('|' if name == 'ACS_VLINE' else '-'))
+
+
+class FakePad:
+    """Just enough of a curses window or pad to run the console, recording every call made to it
+
+    Calls are counted by method name in `calls`, which can be shared between pads."""
+
+    def __init__(self, height, width, calls=None):
+        self.height = height
+        self.width = width
+        self.calls = Counter() if calls is None else calls
+        self.y = 0
+        self.x = 0
+        # Keys returned by getch, -1 once empty
+        self.input = deque()
+
+    def getmaxyx(self):
+        self.calls['getmaxyx'] += 1
+        return self.height, self.width
+
+    def getyx(self):
+        self.calls['getyx'] += 1
+        return self.y, self.x
+
+    def resize(self, height, width):
+        self.calls['resize'] += 1
+        self.height = height
+        self.width = width
+
+    def move(self, y, x):
+        self.calls['move'] += 1
+        self.y = y
+        self.x = x
+
+    def getch(self):
+        self.calls['getch'] += 1
+        return self.input.popleft() if self.input else -1
+
+    def instr(self, y, x, n):
+        self.calls['instr'] += 1
+        return b' ' * n
+
+    def __getattr__(self, name):
+        # Every other curses method is recorded and does nothing
+        if name.startswith('__'):
+            raise AttributeError(name)
+        def record_call(*args):
+            self.calls[name] += 1
+        return record_call
+
+
+def make_console(height, width, calls=None, **kwargs):
+    console = SnapConsole(**kwargs)
+    calls = Counter() if calls is None else calls
+    # Pads the console creates later, like those of panes, record into the same counter
+    curses.newpad = lambda height, width: FakePad(height, width, calls)
+    curses.doupdate = lambda: calls.update(['doupdate'])
+    console.stdscr = FakePad(height, width, calls)
+    console.displaypad = FakePad(height - 1, width, calls)
+    console.arrowpad = FakePad(1, 2, calls)
+    console.textpadpad = FakePad(1, width - 2, calls)
+    console.textpad = Textbox(console.textpadpad, insert_mode=True)
+    return console
@@ -0,0 +1,290 @@
+"""Times the main rendering and input paths against the headless curses stand-in.
+
+Run from the repository root:
+    python benchmarks/suite.py
+    python benchmarks/suite.py --save results.json
+    python benchmarks/suite.py --baseline results.json
+
+With --baseline, the run fails if a scenario got slower than the baseline by more than the
+tolerance, or made more curses calls. Call counts do not depend on the machine, so they can be
+compared exactly in CI.
+"""
+
+import argparse
+import curses
+import json
+import sys
+import time
+from collections import Counter
+
+from headless import make_console
+from snapconsole.snapconsole import default_log_splitter
+from snapconsole.wrappedlist import WrappedList
+
+
+class Scenario:
+    def __init__(self, name, ops, frames, calls, elapsed):
+        self.name = name
+        self.ops = ops
+        self.frames = frames
+        self.calls = calls
+        self.elapsed = elapsed
+
+    @property
+    def ops_per_sec(self):
+        return self.ops / self.elapsed if self.elapsed > 0 else float('inf')
+
+    @property
+    def calls_per_frame(self):
+        return sum(self.calls.values()) / max(self.frames, 1)
+
+    @property
+    def calls_per_op(self):
+        return sum(self.calls.values()) / self.ops
+
+    def to_json(self):
+        return {
+            'ops_per_sec': self.ops_per_sec,
+            'frames': self.frames,
+            'calls_per_frame': self.calls_per_frame,
+            'calls_per_op': self.calls_per_op,
+            'calls': dict(self.calls),
+        }
+
+
+def run_console_scenario(name, setup, action, ops, height=50, width=120, **kwargs):
+    # `setup` prepares the console without being timed, `action` is timed and does `ops` operations
+    calls = Counter()
+    console = make_console(height, width, calls=calls, **kwargs)
+    setup(console)
+    console.flush()
+    calls.clear()
+    frames = 0
+
+    def counted(draw):
+        def counted_draw():
+            nonlocal frames
+            frames += 1
+            draw()
+        return counted_draw
+    # Frames are drawn by the scheduler, and by a full redraw after a resize
+    console._redraw_scheduler.draw = counted(console._redraw_scheduler.draw)
+    console.do_draw = counted(console.do_draw)
+    start = time.perf_counter()
+    action(console)
+    console.flush()
+    elapsed = time.perf_counter() - start
+    return Scenario(name, ops, frames, calls, elapsed)
+
+
+def run_plain_scenario(name, action, ops):
+    start = time.perf_counter()
+    action()
+    return Scenario(name, ops, 0, Counter(), time.perf_counter() - start)
+
+
+def appends(count=10000):
+    def action(console):
+        for i in range(count):
+            console.logs.append(f'Log entry {i}: ' + 'lorem ipsum ' * 5)
+    return run_console_scenario('appends', lambda console: None, action, count, max_fps=None)
+
+
+def batched_appends(count=10000, batch_size=100):
+    def action(console):
+        for i in range(0, count, batch_size):
+            with console.batch():
+                for j in range(i, i + batch_size):
+                    console.logs.append(f'Log entry {j}: ' + 'lorem ipsum ' * 5)
+    return run_console_scenario('batched_appends', lambda console: None, action, count, max_fps=None)
+
+
+def wide_resize(resizes=50):
+    def setup(console):
+        console.logs += [f'Log entry {i}: ' + 'lorem ipsum ' * (i % 40) for i in range(10000)]
+
+    def action(console):
+        for i in range(resizes):
+            width = 400 if i % 2 == 0 else 120
+            console.stdscr.resize(100, width)
+            console.handle_resize()
+    return run_console_scenario('wide_resize', setup, action, resizes, max_fps=None)
+
+
+def scrolled_resize(resizes=50):
+    # Scrolled back, so every resize needs the line index of the whole backlog at the new width
+    def setup(console):
+        console.logs += [f'Log entry {i}: ' + 'lorem ipsum ' * (i % 40) for i in range(10000)]
+        console.scroll_offset = 5000
+
+    def action(console):
+        for i in range(resizes):
+            width = 400 if i % 2 == 0 else 120
+            console.stdscr.resize(100, width)
+            console.handle_resize()
+    return run_console_scenario('scrolled_resize', setup, action, resizes, max_fps=None)
+
+
+def resize_storm(bursts=20, burst_size=30):
+    # Resize events as sent while dragging a terminal edge, a burst at a time
+    now = 0.0
+
+    def setup(console):
+        console.logs += [f'Log entry {i}: ' + 'lorem ipsum ' * (i % 40) for i in range(10000)]
+        console.stats.clock = lambda: now
+
+    def action(console):
+        nonlocal now
+        for i in range(bursts):
+            for j in range(burst_size):
+                console.stdscr.resize(100, 80 + j * 10)
+                console._handle_input_ch(curses.KEY_RESIZE)
+                now += 0.01
+            now += 1
+            console._maybe_handle_resize()
+    return run_console_scenario('resize_storm', setup, action, bursts * burst_size, max_fps=None)
+
+
+def busy_pane(count=5000):
+    # One busy pane next to quiet ones, only the busy pane should be drawn on each frame
+    def setup(console):
+        console.logs += [f'Log entry {i}: ' + 'lorem ipsum ' * (i % 10) for i in range(1000)]
+        for name in ('left', 'bottom'):
+            pane = console.add_pane(name, name, 0.3, max_logs=1000)
+            pane.logs += [f'{name} entry {i}' for i in range(1000)]
+        console.add_pane('busy', 'right', 0.5, max_logs=1000)
+
+    def action(console):
+        busy = console.panes['busy']
+        for i in range(count):
+            busy.logs.append(f'Busy entry {i}: ' + 'lorem ipsum ' * (i % 5))
+            console.flush()
+    return run_console_scenario('busy_pane', setup, action, count, max_fps=None)
+
+
+def long_entry_wrapping(count=200):
+    def action(console):
+        for i in range(count):
+            console.logs.append(f'Long entry {i}: ' + 'lorem ipsum dolor sit amet ' * 200)
+    return run_console_scenario('long_entry_wrapping', lambda console: None, action, count, max_fps=None)
+
+
+def scrollback(jumps=1000):
+    def setup(console):
+        console.logs += [f'Log entry {i}: ' + 'lorem ipsum ' * (i % 20) for i in range(20000)]
+
+    def action(console):
+        for i in range(jumps):
+            console.scroll_offset = (i * 7919) % 20000
+            console.flush()
+    return run_console_scenario('scrollback', setup, action, jumps, max_fps=None)
+
+
+def paste(length=2000, pastes=20):
+    def action(console):
+        for _ in range(pastes):
+            console.stdscr.input.extend(ord('x') for _ in range(length - 1))
+            console._handle_input_ch(ord('x'))
+            console.textpad.clear()
+    return run_console_scenario('paste', lambda console: None, action, pastes * length)
+
+
+def typing(keys=5000):
+    def action(console):
+        for i in range(keys):
+            console._handle_input_ch(ord('a') + i % 26)
+            if i % 100 == 99:
+                console._handle_input_ch(ord('\n'))
+    return run_console_scenario('typing', lambda console: None, action, keys)
+
+
+def textbox_commands(keys=20000):
+    commands = [ord('a'), ord('b'), curses.KEY_LEFT, curses.KEY_RIGHT, curses.KEY_BACKSPACE, 1, 5] # ^a, ^e
+
+    def action(console):
+        for i in range(keys):
+            console.textpad.do_command(commands[i % len(commands)])
+    return run_console_scenario('textbox_commands', lambda console: None, action, keys)
+
+
+def splitter(count=20000):
+    entries = [f'Log entry {i}: ' + 'lorem ipsum\tdolor ' * (i % 30) + '\nsecond line' * (i % 3) for i in range(count)]
+
+    def action():
+        for entry in entries:
+            default_log_splitter(entry, 120)
+    return run_plain_scenario('splitter', action, count)
+
+
+def wrapped_list_callback(count=200000):
+    def action():
+        wrapped = WrappedList(lambda: None)
+        for i in range(count):
+            wrapped.append(i)
+    return run_plain_scenario('wrapped_list_callback', action, count)
+
+
+SCENARIOS = [
+    appends,
+    batched_appends,
+    wide_resize,
+    scrolled_resize,
+    resize_storm,
+    busy_pane,
+    long_entry_wrapping,
+    scrollback,
+    paste,
+    typing,
+    textbox_commands,
+    splitter,
+    wrapped_list_callback,
+]
+
+
+def compare(results, baseline, tolerance):
+    failures = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        expected = baseline[name]
+        if result['ops_per_sec'] < expected['ops_per_sec'] * (1 - tolerance):
+            failures.append(f'{name}: {result["ops_per_sec"]:.0f} ops/s, baseline {expected["ops_per_sec"]:.0f} ops/s')
+        if sum(result['calls'].values()) > sum(expected['calls'].values()):
+            failures.append(f'{name}: {sum(result["calls"].values())} curses calls, baseline {sum(expected["calls"].values())}')
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('scenarios', nargs='*', help='Scenarios to run, all of them by default')
+    parser.add_argument('--save', help='Write the results to this JSON file')
+    parser.add_argument('--baseline', help='Compare the results to this JSON file')
+    parser.add_argument('--tolerance', type=float, default=0.3, help='Allowed slowdown against the baseline')
+    args = parser.parse_args()
+
+    scenarios = [scenario for scenario in SCENARIOS if not args.scenarios or scenario.__name__ in args.scenarios]
+    results = {}
+    print(f'{"scenario":>22} {"ops/s":>12} {"frames":>8} {"calls/frame":>12} {"calls/op":>10}')
+    for scenario in scenarios:
+        result = scenario()
+        results[result.name] = result.to_json()
+        calls_per_frame = f'{result.calls_per_frame:.1f}' if result.frames > 0 else '-'
+        print(
+            f'{result.name:>22} {result.ops_per_sec:>12.0f} {result.frames:>8} {calls_per_frame:>12} '
+            f'{result.calls_per_op:>10.2f}'
+        )
+
+    if args.save:
+        with open(args.save, 'w') as file:
+            json.dump(results, file, indent=2)
+    if args.baseline:
+        with open(args.baseline) as file:
+            failures = compare(results, json.load(file), args.tolerance)
+        for failure in failures:
+            print('Regression:', failure)
+        if failures:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
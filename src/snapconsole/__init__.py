@@ -1 +1,6 @@
-from .snapconsole import SnapConsole, LogEntry, LogsAlignPosition, TextboxAlignPosition
\ No newline at end of file
+from .snapconsole import SnapConsole, LogEntry, LogsAlignPosition, TextboxAlignPosition, unicode_log_splitter
+from .archive import LogArchive
+from .ingest import LogBackpressure
+from .pane import LogPane
+from .sources import FileTailSource, LoggingSource, ProcessSource, UnixSocketSource
+from .styledline import StyledLine
\ No newline at end of file
@@ -0,0 +1,224 @@
+import json
+import mmap
+import os
+import tempfile
+from array import array
+from itertools import chain
+
+from .styledline import StyledLine
+from .wrappedlist import new_list_id
+
+# Number of entries kept decoded, enough for a few screens of scrollback
+DECODED_CACHE_SIZE = 1024
+
+
+def encode_entry(log_entry):
+    if isinstance(log_entry, StyledLine):
+        log_entry = {'styled': log_entry.to_entry()}
+    return json.dumps(log_entry, ensure_ascii=False).encode() + b'\n'
+
+
+def decode_entry(data):
+    if data[:1] == b'"' and b'\\' not in data:
+        # A string without escapes, which is most logs, is the text between the quotes
+        return data[1:-2].decode()
+    log_entry = json.loads(data)
+    if isinstance(log_entry, dict):
+        return StyledLine(*log_entry['styled'])
+    return log_entry
+
+
+class LogArchive:
+    """Log entries stored in a file on disk, read back through mmap
+
+    Entries are appended to the file as JSON lines, and the offset of each one is kept in an array,
+    so any entry can be read back in O(1) without keeping the entries in memory. The file is a
+    temporary file deleted on close, unless `path` is given. Recently read entries are kept
+    decoded, so scrolling through them does not decode them on every frame.
+
+        with SnapConsole(max_logs=10000, log_archive=LogArchive()) as console:
+            ...
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self._file = tempfile.TemporaryFile() if path is None else open(path, 'w+b')
+        # Offset of every entry in the file, followed by the end of the file
+        self._offsets = array('q', [0])
+        self._map = None
+        self._decoded = {}
+        # Bumped whenever the archive is cleared, so views of it can tell
+        self.clear_count = 0
+        # Called after the archive is cleared
+        self.on_clear = None
+
+    def append(self, log_entry):
+        self.extend([log_entry])
+
+    def extend(self, log_entries):
+        data = []
+        end = self._offsets[-1]
+        for log_entry in log_entries:
+            encoded = encode_entry(log_entry)
+            data.append(encoded)
+            end += len(encoded)
+            self._offsets.append(end)
+        self._file.seek(0, os.SEEK_END)
+        self._file.write(b''.join(data))
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if index < 0 or index >= len(self):
+            raise IndexError('archive index out of range')
+        log_entry = self._decoded.get(index)
+        if log_entry is None:
+            if len(self._decoded) >= DECODED_CACHE_SIZE:
+                self._decoded.clear()
+            log_entry = self._decoded[index] = decode_entry(self._read(index))
+        return log_entry
+
+    def __iter__(self):
+        # Reads every entry in order without going through the decoded entries
+        offsets = self._offsets
+        if len(offsets) == 1:
+            return
+        data = self._mapped(offsets[-1])
+        for index in range(len(offsets) - 1):
+            yield decode_entry(data[offsets[index]:offsets[index + 1]])
+
+    def _read(self, index):
+        return self._mapped(self._offsets[index + 1])[self._offsets[index]:self._offsets[index + 1]]
+
+    def _mapped(self, end):
+        # Map of the file, covering at least up to `end`
+        if self._map is None or end > len(self._map):
+            # Entries written since the file was last mapped are not in the map yet
+            self._file.flush()
+            if self._map is not None:
+                self._map.close()
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._map
+
+    def clear(self):
+        self._close_map()
+        self._file.seek(0)
+        self._file.truncate()
+        self._offsets = array('q', [0])
+        self.clear_count += 1
+        if self.on_clear is not None:
+            self.on_clear()
+
+    def _close_map(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._decoded.clear()
+
+    def close(self):
+        self._close_map()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        self.close()
+
+
+class ArchivedLogs:
+    """Read-only list of the archived logs followed by the logs still in memory
+
+    Has the same `change_token` as `WrappedList`, so the display can be kept in step with it
+    incrementally: logs moving from memory to the archive are neither appended nor dropped, and
+    any edit to the logs in memory other than an append counts as a rewrite. `frozen_count` is the
+    number of logs at the front that can no longer be edited."""
+
+    def __init__(self, archive, get_logs):
+        self.archive = archive
+        self.get_logs = get_logs
+        self.list_id = new_list_id()
+        self._logs_token = None
+        self._evicted_count = 0
+        self._clear_count = archive.clear_count
+        self._rewrite_count = 0
+        self._appended_count = 0
+        self._dropped_count = 0
+
+    def _sync(self):
+        logs = self.get_logs()
+        token = logs.change_token
+        evicted_count = getattr(logs, 'evicted_count', 0)
+        if self._logs_token is None:
+            self._logs_token = token
+            self._evicted_count = evicted_count
+            return logs
+        if token == self._logs_token and self.archive.clear_count == self._clear_count:
+            return logs
+
+        logs_id, rewrite_count, appended_count, dropped_count = token
+        last_logs_id, last_rewrite_count, last_appended_count, last_dropped_count = self._logs_token
+        # Logs dropped from the front by an edit rather than by moving to the archive
+        removed = (dropped_count - last_dropped_count) - (evicted_count - self._evicted_count)
+        if (
+            logs_id != last_logs_id or rewrite_count != last_rewrite_count
+            or self.archive.clear_count != self._clear_count
+        ):
+            self._rewrite_count += 1
+        elif removed > 0:
+            if len(self.archive) == 0:
+                self._dropped_count += removed
+            else:
+                # The logs in memory no longer follow on from the archive
+                self._rewrite_count += 1
+        self._appended_count += appended_count - last_appended_count
+        self._logs_token = token
+        self._evicted_count = evicted_count
+        self._clear_count = self.archive.clear_count
+        return logs
+
+    @property
+    def change_token(self):
+        self._sync()
+        return (self.list_id, self._rewrite_count, self._appended_count, self._dropped_count)
+
+    @property
+    def appended_count(self):
+        self._sync()
+        return self._appended_count
+
+    @property
+    def dropped_count(self):
+        self._sync()
+        return self._dropped_count
+
+    @property
+    def frozen_count(self):
+        return len(self.archive)
+
+    def __len__(self):
+        return len(self.archive) + len(self.get_logs())
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            archived = len(self.archive)
+            if step == 1 and start >= archived:
+                return self.get_logs()[start - archived:stop - archived]
+            return [self[i] for i in range(start, stop, step)]
+        archived = len(self.archive)
+        if index < 0:
+            index += len(self)
+        if index < 0:
+            raise IndexError('list index out of range')
+        if index < archived:
+            return self.archive[index]
+        return self.get_logs()[index - archived]
+
+    def __iter__(self):
+        return chain(self.archive, self.get_logs())
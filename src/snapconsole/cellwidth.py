@@ -0,0 +1,61 @@
+"""Terminal cell widths of unicode characters"""
+
+import unicodedata
+
+# Width given to characters that should not be drawn at all
+UNPRINTABLE = 255
+
+# Widths are memoized in pages of 256 code points, built the first time a code point in the page is seen
+_PAGE_SIZE = 256
+_width_pages = [None] * (0x110000 // _PAGE_SIZE)
+
+
+def _compute_width(ch):
+    category = unicodedata.category(ch)
+    if category in ('Cc', 'Cs', 'Zl', 'Zp'):
+        return UNPRINTABLE
+    if category in ('Mn', 'Me', 'Cf') or unicodedata.combining(ch):
+        # Combining marks and format characters such as zero width joiners take no cell
+        return 0
+    if unicodedata.east_asian_width(ch) in ('W', 'F'):
+        return 2
+    return 1
+
+
+def _build_page(page_index):
+    base = page_index * _PAGE_SIZE
+    page = bytes(_compute_width(chr(base + i)) for i in range(_PAGE_SIZE))
+    _width_pages[page_index] = page
+    return page
+
+
+def char_width(ch):
+    code_point = ord(ch)
+    page = _width_pages[code_point // _PAGE_SIZE]
+    if page is None:
+        page = _build_page(code_point // _PAGE_SIZE)
+    return page[code_point % _PAGE_SIZE]
+
+
+def char_widths(text):
+    return [char_width(ch) for ch in text]
+
+
+def strip_unprintable(text):
+    if text.isascii():
+        if text.isprintable():
+            return text
+        return ''.join(ch for ch in text if ch.isprintable())
+    return ''.join(ch for ch in text if char_width(ch) != UNPRINTABLE)
+
+
+def str_width(text):
+    # Number of cells `text` takes up in the terminal, unprintable characters take none
+    if text.isascii():
+        return len(text)
+    width = 0
+    for ch in text:
+        ch_width = char_width(ch)
+        if ch_width != UNPRINTABLE:
+            width += ch_width
+    return width
@@ -0,0 +1,125 @@
+import threading
+from collections import deque
+from contextlib import suppress
+from enum import Enum
+
+
+class LogBackpressure(Enum):
+    # What posting a log does once the queue is at its high-water mark
+    BLOCK = 'block'
+    DROP_OLDEST = 'drop_oldest'
+    DROP_NEWEST = 'drop_newest'
+    SUMMARIZE = 'summarize'
+
+
+def suppressed_line(count):
+    # Plain ASCII, as the default log splitter strips characters it cannot draw
+    return f'... {count:,} lines suppressed ...'
+
+
+class LogQueue:
+    """Collects logs posted from any thread until the UI loop drains them
+
+    Posting only holds a lock for the append and the counters, so producers never wait on curses
+    or on the UI loop. The UI loop takes everything posted so far in one `drain`.
+
+    With `max_pending` set, at most that many logs wait to be drained, and `backpressure` decides
+    what happens to the logs posted over it: `BLOCK` waits for the next drain, `DROP_OLDEST` and
+    `DROP_NEWEST` drop a log, and `SUMMARIZE` drops the log and counts it in a line added at the
+    end of the next drain. The UI thread is never blocked, as it is the one draining the logs.
+    `BLOCK` drops the log if `block_timeout` seconds pass before the drain.
+
+    Once the queue is closed, which the console does when it stops, waiting posts are woken up
+    and every log posted is dropped, as nothing will drain them."""
+
+    def __init__(self, max_pending=None, backpressure=LogBackpressure.DROP_OLDEST, block_timeout=None):
+        self._entries = deque()
+        self.max_pending = max_pending
+        self.backpressure = backpressure
+        self.block_timeout = block_timeout
+        self.closed = False
+        # Called from the posting thread to wake the UI loop, if the loop can be woken
+        self.wakeup = None
+        self._wakeup_requested = False
+        # Guards the counters, and wakes posts waiting under `BLOCK` on every drain
+        self._not_full = threading.Condition()
+        self._drain_thread = threading.get_ident()
+        # Logs dropped by `SUMMARIZE` since the last drain
+        self._suppressed_count = 0
+        self.posted_count = 0
+        self.dropped_count = 0
+        # Posts that had to wait for a drain
+        self.blocked_count = 0
+        # Most logs that were waiting to be drained at once
+        self.peak_pending = 0
+
+    def post(self, entry):
+        with self._not_full:
+            self.posted_count += 1
+            if self.closed:
+                self.dropped_count += 1
+                return
+            if self.max_pending is None:
+                self._entries.append(entry)
+            else:
+                self._post_bounded(entry)
+            if len(self._entries) > self.peak_pending:
+                self.peak_pending = len(self._entries)
+            # Only the first post after a drain wakes the loop, the rest are picked up by the same drain
+            wakeup = self.wakeup if not self._wakeup_requested else None
+            if wakeup is not None:
+                self._wakeup_requested = True
+        if wakeup is not None:
+            with suppress(RuntimeError):
+                wakeup()
+
+    def _post_bounded(self, entry):
+        entries = self._entries
+        if len(entries) < self.max_pending:
+            entries.append(entry)
+        elif self.backpressure == LogBackpressure.BLOCK and threading.get_ident() != self._drain_thread:
+            self.blocked_count += 1
+            drained = self._not_full.wait_for(
+                lambda: self.closed or len(entries) < self.max_pending, self.block_timeout
+            )
+            if drained and not self.closed:
+                entries.append(entry)
+            else:
+                self.dropped_count += 1
+        elif self.backpressure == LogBackpressure.DROP_OLDEST:
+            entries.popleft()
+            entries.append(entry)
+            self.dropped_count += 1
+        elif self.backpressure == LogBackpressure.SUMMARIZE:
+            self._suppressed_count += 1
+            self.dropped_count += 1
+        elif self.backpressure == LogBackpressure.DROP_NEWEST:
+            self.dropped_count += 1
+        else:
+            # Posted from the UI thread, which would never be woken up
+            entries.append(entry)
+
+    def drain(self):
+        self._drain_thread = threading.get_ident()
+        self._wakeup_requested = False
+        entries = self._entries
+        if self.max_pending is None:
+            return [entries.popleft() for _ in range(len(entries))]
+        with self._not_full:
+            drained = [entries.popleft() for _ in range(len(entries))]
+            if self._suppressed_count > 0:
+                drained.append(suppressed_line(self._suppressed_count))
+                self._suppressed_count = 0
+            self._not_full.notify_all()
+        return drained
+
+    def close(self):
+        with self._not_full:
+            self.closed = True
+            self._not_full.notify_all()
+
+    def open(self):
+        self.closed = False
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,143 @@
+from itertools import compress, count, islice
+from operator import is_not
+
+UNCHECKED = 0
+SHOWN = 1
+HIDDEN = 2
+
+
+class LogFilter:
+    """Memoized results of a predicate over the logs
+
+    Logs are only checked when they are about to be drawn, or a chunk at a time by `check`, and
+    every result is kept in a bytearray. The results follow the logs through their `change_token`:
+    appends and removals from the front move the results along, and any other edit only
+    forgets the results of logs that were replaced. Logs that can no longer be edited, the first
+    `frozen_count` logs of lists that have it, are not kept around to tell if they were replaced."""
+
+    def __init__(self, predicate):
+        self.predicate = predicate
+        self._token = None
+        # The log each result was computed for, to tell which logs were replaced
+        self._entries = []
+        self._results = bytearray()
+        # Position of `_entries[0]` and of the first log still in the list, counted from the
+        # first log ever seen
+        self._base = 0
+        self._start = 0
+        # Position of the first log that is not frozen
+        self._frozen = 0
+        self.hidden_count = 0
+        self.check_count = 0
+
+    def sync(self, logs):
+        token = logs.change_token
+        if token == self._token:
+            return
+        frozen_count = getattr(logs, 'frozen_count', 0)
+        # Fewer frozen logs than before means the frozen logs were replaced
+        if self._token is None or token[0] != self._token[0] or self._start + frozen_count < self._frozen:
+            self._entries = [None] * frozen_count + logs[frozen_count:]
+            self._results = bytearray(len(self._entries))
+            self._base = 0
+            self._start = 0
+            self._frozen = frozen_count
+            self.hidden_count = 0
+            self._token = token
+            return
+
+        _, rewrite_count, appended_count, dropped_count = token
+        _, last_rewrite_count, last_appended_count, last_dropped_count = self._token
+        self._drop(dropped_count - last_dropped_count)
+        if rewrite_count != last_rewrite_count:
+            self._match_entries(logs, frozen_count)
+        else:
+            appended = min(appended_count - last_appended_count, len(logs))
+            self._entries += logs[len(logs) - appended:]
+            self._results += bytes(appended)
+        self._freeze(self._start + frozen_count)
+        self._token = token
+
+    def _freeze(self, frozen):
+        for position in range(max(self._frozen, self._base), frozen):
+            self._entries[position - self._base] = None
+        self._frozen = frozen
+
+    def _drop(self, dropped):
+        offset = self._start - self._base
+        dropped = min(dropped, len(self._entries) - offset)
+        self.hidden_count -= self._results.count(HIDDEN, offset, offset + dropped)
+        self._start += dropped
+        if self._start - self._base > len(self._entries) // 2:
+            offset = self._start - self._base
+            del self._entries[:offset]
+            del self._results[:offset]
+            self._base = self._start
+
+    def _match_entries(self, logs, frozen_count):
+        # Forgets the results of logs that are no longer at the same position
+        offset = self._start - self._base
+        length = len(self._entries) - offset
+        if length > len(logs):
+            self.hidden_count -= self._results.count(HIDDEN, offset + len(logs))
+            del self._entries[offset + len(logs):]
+            del self._results[offset + len(logs):]
+        elif length < len(logs):
+            self._entries += [None] * (len(logs) - length)
+            self._results += bytes(len(logs) - length)
+        # Frozen logs cannot have been replaced, and were not kept to compare against
+        start = max(self._frozen - self._start, 0)
+        replaced = compress(count(start), map(is_not, islice(self._entries, offset + start, None), logs[start:]))
+        for index in replaced:
+            if self._results[offset + index] == HIDDEN:
+                self.hidden_count -= 1
+            self._entries[offset + index] = logs[index]
+            self._results[offset + index] = UNCHECKED
+
+    def _check(self, logs, index):
+        position = self._start - self._base + index
+        result = SHOWN if self.predicate(logs[index]) else HIDDEN
+        self.check_count += 1
+        self._results[position] = result
+        if result == HIDDEN:
+            self.hidden_count += 1
+        return result
+
+    def is_shown(self, logs, index):
+        result = self._results[self._start - self._base + index]
+        if result == UNCHECKED:
+            result = self._check(logs, index)
+        return result == SHOWN
+
+    def previous_shown(self, logs, index, check_limit=None):
+        """Returns the index of the last shown log before `index`, -1 if there is none, or None if
+        `check_count` reaches `check_limit` before it is found"""
+        offset = self._start - self._base
+        results = self._results
+        end = offset + index
+        # Hidden logs are skipped by searching the results, only the unchecked logs after the
+        # last log known to be shown have to be checked
+        shown = results.rfind(SHOWN, offset, end)
+        while True:
+            position = results.rfind(UNCHECKED, max(shown + 1, offset), end)
+            if position < 0:
+                return shown - offset if shown >= 0 else -1
+            if check_limit is not None and self.check_count >= check_limit:
+                return None
+            if self._check(logs, position - offset) == SHOWN:
+                return position - offset
+            end = position
+
+    def check(self, logs, limit):
+        """Checks up to `limit` logs that have not been checked yet, newest first, and returns
+        whether any are left"""
+        offset = self._start - self._base
+        results = self._results
+        end = len(results)
+        for _ in range(limit):
+            position = results.rfind(UNCHECKED, offset, end)
+            if position < 0:
+                return False
+            self._check(logs, position - offset)
+            end = position
+        return results.find(UNCHECKED, offset) >= 0
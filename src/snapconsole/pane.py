@@ -0,0 +1,139 @@
+import curses
+from contextlib import suppress
+
+from .cellwidth import str_width
+from .wrapcache import WrapCache
+from .wrappedlist import WrappedListDescriptor
+
+PANE_SIDES = ('left', 'right', 'top', 'bottom')
+
+
+def draw_row(pad, y, row, width):
+    # Draws a row of (attr, text) runs over line `y` of `pad`
+    pad.move(y, 0)
+    pad.clrtoeol()
+    cur_x = 0
+    for attr, text in row:
+        with suppress(curses.error):
+            pad.insnstr(y, cur_x, text, width - cur_x, attr)
+        cur_x += str_width(text)
+
+
+def dock_panes(y, x, height, width, panes):
+    """Splits a region between `panes` in order, each taking its `size` from its `side` of what is
+    left, with a border line between it and the rest
+
+    Returns the (y, x, height, width) of every pane that fits by name, the border lines as
+    (y, x, length, vertical), and the (y, x, height, width) left over."""
+    pane_coords = {}
+    borders = []
+    for pane in panes:
+        vertical = pane.side in ('left', 'right')
+        available = (width if vertical else height) - 1
+        size = pane.size
+        if isinstance(size, float):
+            size = round(available * size)
+        # Leave at least a line of the region for the panes after it
+        size = min(size, available - 1)
+        if size < 1:
+            continue
+        if pane.side == 'left':
+            pane_coords[pane.name] = (y, x, height, size)
+            borders.append((y, x + size, height, True))
+            x += size + 1
+            width -= size + 1
+        elif pane.side == 'right':
+            pane_coords[pane.name] = (y, x + width - size, height, size)
+            borders.append((y, x + width - size - 1, height, True))
+            width -= size + 1
+        elif pane.side == 'top':
+            pane_coords[pane.name] = (y, x, size, width)
+            borders.append((y + size, x, width, False))
+            y += size + 1
+            height -= size + 1
+        else:
+            pane_coords[pane.name] = (y + height - size, x, size, width)
+            borders.append((y + height - size - 1, x, width, False))
+            height -= size + 1
+    return pane_coords, borders, (y, x, height, width)
+
+
+class LogPane:
+    """A named region of the display with its own logs, shown next to the console's logs
+
+    Panes are added with `SnapConsole.add_pane`. A pane always shows its newest logs, keeps at
+    most `max_logs` of them if given, and is only drawn again once its logs changed."""
+
+    logs = WrappedListDescriptor('_handle_logs_changed', 'max_logs')
+
+    def __init__(self, name, side, size, process_entry, log_splitter, max_logs=None, align_top=False, on_change=None):
+        self.name = name
+        self.side = side
+        # Rows or columns taken from the side, or a float for a fraction of the space left
+        self.size = size
+        self.log_splitter = log_splitter
+        self.align_top = align_top
+        # Called whenever the pane has to be drawn again
+        self.on_change = on_change
+        self._max_logs = max_logs
+        self.logs = []
+        self.pad = None
+        self._size = (0, 0)
+        self.dirty = True
+        self._wrap_cache = WrapCache(process_entry)
+        # Runs drawn on each row of the pad
+        self._drawn_rows = []
+
+    def _handle_logs_changed(self):
+        self.dirty = True
+        if self.on_change is not None:
+            self.on_change()
+
+    @property
+    def max_logs(self):
+        return self._max_logs
+
+    @max_logs.setter
+    def max_logs(self, new_val):
+        self._max_logs = new_val
+        self.logs = list(self.logs)
+
+    def resize(self, height, width):
+        if self.pad is None:
+            self.pad = curses.newpad(height, width)
+        else:
+            self.pad.resize(height, width)
+            self.pad.erase()
+        self._size = self.pad.getmaxyx()
+        self._drawn_rows = [()] * self._size[0]
+        self.dirty = True
+
+    def hide(self):
+        # The pane no longer fits on the screen
+        self.pad = None
+        self._drawn_rows = []
+
+    def draw(self):
+        """Draws the rows that changed since the last draw, and returns the number of curses calls"""
+        self.dirty = False
+        if self.pad is None:
+            return 0
+        height, width = self._size
+        lines = []
+        for entry in reversed(self.logs):
+            lines += reversed(self._wrap_cache.get_lines(entry, width, self.log_splitter))
+            if len(lines) >= height:
+                break
+        self._wrap_cache.sweep()
+        lines = lines[:height]
+        lines.reverse()
+        padding = [()] * (height - len(lines))
+        rows = lines + padding if self.align_top else padding + lines
+
+        curses_calls = 1
+        for y, row in enumerate(rows):
+            if row != self._drawn_rows[y]:
+                draw_row(self.pad, y, row, width)
+                curses_calls += 2 + len(row)
+        self._drawn_rows = rows
+        return curses_calls
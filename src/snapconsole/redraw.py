@@ -0,0 +1,109 @@
+import asyncio
+import time
+
+
+class RedrawScheduler:
+    """Coalesces redraw requests so `draw` runs at most `max_fps` times a second
+
+    Mutations only mark the display as dirty; the pending frame is drawn once the frame
+    interval has passed, or straight away with `flush`."""
+
+    def __init__(self, draw, max_fps=60, clock=time.monotonic):
+        self.draw = draw
+        self.max_fps = max_fps
+        self.clock = clock
+        self.dirty = False
+        self.frames_drawn = 0
+        self._last_frame_time = None
+
+    @property
+    def frame_interval(self):
+        if not self.max_fps:
+            return 0
+        return 1 / self.max_fps
+
+    def mark_dirty(self):
+        self.dirty = True
+
+    def time_until_frame(self):
+        # Seconds until the pending frame may be drawn, or None if there is nothing to draw
+        if not self.dirty:
+            return None
+        if self._last_frame_time is None:
+            return 0
+        return max(0, self._last_frame_time + self.frame_interval - self.clock())
+
+    def maybe_flush(self):
+        # Draws the pending frame if the frame interval has passed
+        if self.time_until_frame() == 0:
+            self.flush()
+            return True
+        return False
+
+    def flush(self):
+        if not self.dirty:
+            return
+        self.dirty = False
+        self._last_frame_time = self.clock()
+        self.frames_drawn += 1
+        self.draw()
+
+    def cancel(self):
+        self.dirty = False
+
+
+class BlockingRedrawScheduler(RedrawScheduler):
+    """Draws from the mutations themselves, as there is no event loop to draw from
+
+    Only the first mutation after the frame interval has passed is drawn. Mutations in between
+    are left pending until the next mutation that is due, an input read, or an explicit `flush`,
+    so callers about to block on other work should `flush` first. Without `coalesce`, every
+    mutation is drawn straight away."""
+
+    def __init__(self, draw, max_fps=60, clock=time.monotonic, coalesce=True):
+        super().__init__(draw, max_fps, clock)
+        self.coalesce = coalesce
+
+    def mark_dirty(self):
+        super().mark_dirty()
+        if self.coalesce:
+            self.maybe_flush()
+        else:
+            self.flush()
+
+
+class AsyncRedrawScheduler(RedrawScheduler):
+    """Draws pending frames from a timer on the running event loop
+
+    When no event loop is running, pending frames are drawn like `BlockingRedrawScheduler` does."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._timer = None
+
+    def mark_dirty(self):
+        super().mark_dirty()
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.maybe_flush()
+            return
+        if self._timer is None:
+            self._timer = loop.call_later(self.time_until_frame(), self._handle_timer)
+
+    def _handle_timer(self):
+        self._timer = None
+        self.flush()
+
+    def flush(self):
+        self._cancel_timer()
+        super().flush()
+
+    def cancel(self):
+        self._cancel_timer()
+        super().cancel()
+
+    def _cancel_timer(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
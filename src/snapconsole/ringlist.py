@@ -0,0 +1,177 @@
+from collections.abc import MutableSequence
+from itertools import chain, islice
+
+
+class RingList(MutableSequence):
+    """List with a maximum length, backed by a ring buffer
+
+    Appending to a full list evicts the oldest item in O(1), and indexing stays O(1).
+    Edits in the middle of the list fall back to regular list operations. `on_evict` is called
+    with a list of the evicted items, oldest first, whenever items are evicted."""
+
+    def __init__(self, iterable=(), maxlen=None, on_evict=None):
+        if maxlen is None or maxlen < 0:
+            raise ValueError('maxlen should be a non-negative integer')
+        self._maxlen = maxlen
+        self._items = []
+        # Index of the oldest item in `_items`, only non-zero once the buffer is full
+        self._start = 0
+        self.evicted_count = 0
+        self.on_evict = on_evict
+        self._extend_items(iterable)
+
+    @property
+    def maxlen(self):
+        return self._maxlen
+
+    @maxlen.setter
+    def maxlen(self, maxlen):
+        if maxlen is None or maxlen < 0:
+            raise ValueError('maxlen should be a non-negative integer')
+        self._linearize()
+        self._maxlen = maxlen
+        self._trim()
+
+    def _linearize(self):
+        # Rotates `_items` so the oldest item is at index 0
+        if self._start != 0:
+            self._items = self._items[self._start:] + self._items[:self._start]
+            self._start = 0
+
+    def _trim(self):
+        # Evicts the oldest items until the list fits in maxlen, `_items` has to be linear
+        overflow = len(self._items) - self._maxlen
+        if overflow > 0:
+            evicted = self._items[:overflow]
+            del self._items[:overflow]
+            self._evict(evicted)
+        return max(overflow, 0)
+
+    def _evict(self, items):
+        self.evicted_count += len(items)
+        if self.on_evict is not None:
+            self.on_evict(items)
+
+    def _append_item(self, item):
+        if self._maxlen == 0:
+            self._evict([item])
+        elif len(self._items) < self._maxlen:
+            self._items.append(item)
+        else:
+            self._evict([self._items[self._start]])
+            self._items[self._start] = item
+            self._start = (self._start + 1) % self._maxlen
+
+    def _extend_items(self, iterable):
+        items = list(iterable)
+        skipped = max(len(items) - self._maxlen, 0)
+        if skipped > 0:
+            # Every item in the list would be evicted, and so would the first new items, which
+            # are evicted straight away without being stored
+            self._linearize()
+            evicted = self._items + items[:skipped]
+            self._items = []
+            self._evict(evicted)
+        for item in items[skipped:]:
+            self._append_item(item)
+
+    def _index(self, index):
+        length = len(self._items)
+        if index < 0:
+            index += length
+        if index < 0 or index >= length:
+            raise IndexError('list index out of range')
+        return (self._start + index) % length
+
+    def __len__(self):
+        return len(self._items)
+
+    def __iter__(self):
+        return chain(islice(self._items, self._start, None), islice(self._items, 0, self._start))
+
+    def __reversed__(self):
+        for index in range(len(self._items) - 1, -1, -1):
+            yield self._items[(self._start + index) % len(self._items)]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self._items)))]
+        return self._items[self._index(index)]
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            self._linearize()
+            self._items[index] = value
+            self._trim()
+            return
+        self._items[self._index(index)] = value
+
+    def __delitem__(self, index):
+        self._linearize()
+        del self._items[index]
+
+    def __eq__(self, other):
+        if isinstance(other, (list, RingList)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self):
+        return f'{type(self).__name__}({list(self)!r}, maxlen={self._maxlen})'
+
+    def __add__(self, other):
+        return list(self) + list(other)
+
+    def __radd__(self, other):
+        return list(other) + list(self)
+
+    def __mul__(self, count):
+        return list(self) * count
+
+    __rmul__ = __mul__
+
+    def __iadd__(self, other):
+        self._extend_items(other)
+        return self
+
+    def __imul__(self, count):
+        items = list(self) * count
+        self._items = []
+        self._start = 0
+        self._extend_items(items)
+        return self
+
+    def append(self, item):
+        self._append_item(item)
+
+    def extend(self, iterable):
+        self._extend_items(iterable)
+
+    def insert(self, index, item):
+        self._linearize()
+        self._items.insert(index, item)
+        self._trim()
+
+    def remove(self, item):
+        self._linearize()
+        self._items.remove(item)
+
+    def pop(self, index=-1):
+        if index in (-1, len(self._items) - 1) and self._start == 0:
+            return self._items.pop()
+        self._linearize()
+        return self._items.pop(index)
+
+    def clear(self):
+        self._items = []
+        self._start = 0
+
+    def sort(self, *args, **kwargs):
+        self._linearize()
+        self._items.sort(*args, **kwargs)
+
+    def reverse(self):
+        self._linearize()
+        self._items.reverse()
+
+    def copy(self):
+        return list(self)
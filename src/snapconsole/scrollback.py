@@ -0,0 +1,142 @@
+class FenwickTree:
+    """Prefix sums over a growable list of non-negative integers in O(log n)"""
+
+    def __init__(self, values=()):
+        self._values = list(values)
+        # 1-indexed tree, built in O(n)
+        self._tree = [0] + self._values
+        for i in range(1, len(self._tree)):
+            parent = i + (i & -i)
+            if parent < len(self._tree):
+                self._tree[parent] += self._tree[i]
+
+    def __len__(self):
+        return len(self._values)
+
+    def __getitem__(self, index):
+        return self._values[index]
+
+    def append(self, value):
+        self._values.append(value)
+        i = len(self._values)
+        # The new node covers the values in (i - lowbit(i), i]
+        self._tree.append(value + self.prefix_sum(i - 1) - self.prefix_sum(i - (i & -i)))
+
+    def add(self, index, delta):
+        self._values[index] += delta
+        i = index + 1
+        while i < len(self._tree):
+            self._tree[i] += delta
+            i += i & -i
+
+    def prefix_sum(self, count):
+        # Sum of the first `count` values
+        total = 0
+        i = count
+        while i > 0:
+            total += self._tree[i]
+            i -= i & -i
+        return total
+
+    def find(self, target):
+        # Index of the value that covers position `target` of the running total, i.e. the
+        # smallest index with prefix_sum(index + 1) > target
+        index = 0
+        remaining = target
+        step = 1 << (len(self._tree) - 1).bit_length()
+        while step > 0:
+            next_index = index + step
+            if next_index < len(self._tree) and self._tree[next_index] <= remaining:
+                index = next_index
+                remaining -= self._tree[next_index]
+            step >>= 1
+        return index
+
+
+class LineIndex:
+    """Number of wrapped lines of every log at one width, for random access into wrapped lines
+
+    The index is kept in step with the logs through their `change_token`: appends and removals
+    from the front are applied incrementally, any other edit rebuilds the index. Logs hidden by
+    `log_filter` count as having no lines."""
+
+    def __init__(self):
+        self.width = None
+        self.log_splitter = None
+        self.log_filter = None
+        self._token = None
+        self._tree = FenwickTree()
+        # Logs that were dropped from the front but are still in the tree
+        self._start = 0
+
+    def sync(self, logs, width, log_splitter, log_filter=None):
+        """Brings the index up to date, and returns the number of lines appended since the last sync
+        or None if the index had to be rebuilt"""
+        token = logs.change_token
+        same_layout = width == self.width and log_splitter is self.log_splitter and log_filter is self.log_filter
+        if token == self._token and same_layout:
+            return 0
+        if self._token is None or not same_layout:
+            return self._rebuild(logs, width, log_splitter, log_filter)
+
+        logs_id, rewrite_count, appended_count, dropped_count = token
+        last_logs_id, last_rewrite_count, last_appended_count, last_dropped_count = self._token
+        dropped = dropped_count - last_dropped_count
+        if logs_id != last_logs_id or rewrite_count != last_rewrite_count or dropped > len(self):
+            return self._rebuild(logs, width, log_splitter, log_filter)
+
+        self._start += dropped
+        appended = min(appended_count - last_appended_count, len(logs))
+        added_lines = 0
+        for index in range(len(logs) - appended, len(logs)):
+            line_count = self._line_count(logs, index)
+            self._tree.append(line_count)
+            added_lines += line_count
+        if self._start > len(self._tree) // 2:
+            self._compact()
+        self._token = token
+        return added_lines
+
+    def _line_count(self, logs, index):
+        if self.log_filter is not None and not self.log_filter.is_shown(logs, index):
+            return 0
+        return len(self.log_splitter(logs[index], self.width))
+
+    def _rebuild(self, logs, width, log_splitter, log_filter):
+        self.width = width
+        self.log_splitter = log_splitter
+        self.log_filter = log_filter
+        if log_filter is None:
+            self._tree = FenwickTree(len(log_splitter(entry, width)) for entry in logs)
+        else:
+            self._tree = FenwickTree(self._line_count(logs, index) for index in range(len(logs)))
+        self._start = 0
+        self._token = logs.change_token
+        return None
+
+    def _compact(self):
+        self._tree = FenwickTree(self._tree[i] for i in range(self._start, len(self._tree)))
+        self._start = 0
+
+    def invalidate(self):
+        self._token = None
+
+    def __len__(self):
+        return len(self._tree) - self._start
+
+    @property
+    def total_lines(self):
+        return self._tree.prefix_sum(len(self._tree)) - self._tree.prefix_sum(self._start)
+
+    def line_count(self, index):
+        return self._tree[self._start + index]
+
+    def lines_before(self, index):
+        # Total number of lines of the logs before `index`
+        return self._tree.prefix_sum(self._start + index) - self._tree.prefix_sum(self._start)
+
+    def locate(self, line):
+        """Returns the index of the log containing wrapped line `line`, and the line within that log"""
+        base = self._tree.prefix_sum(self._start)
+        tree_index = self._tree.find(base + line)
+        return tree_index - self._start, base + line - self._tree.prefix_sum(tree_index)
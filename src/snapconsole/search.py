@@ -0,0 +1,113 @@
+from array import array
+from bisect import bisect_right
+
+# Joins entries in a block, it cannot be typed so no query can match across two entries
+ENTRY_SEPARATOR = '\0'
+
+
+class TextIndex:
+    """Case-insensitive substring search over a list of entries, newest first
+
+    Entries are lowercased and joined into blocks of `block_size`, so searching is one `str.find`
+    per block instead of one per entry. Like `LineIndex`, the index is kept in step with the list
+    through its `change_token`: appends and removals from the front are applied incrementally,
+    any other edit rebuilds the index."""
+
+    def __init__(self, entry_text=str, block_size=1024):
+        self.entry_text = entry_text
+        self.block_size = block_size
+        self._token = None
+        self._reset()
+
+    def _reset(self):
+        # Full blocks as (joined text, start of each entry in the text)
+        self._blocks = []
+        # Lowercased entries after the last full block
+        self._tail = []
+        self._tail_block = None
+        # Position of the first entry in `_blocks`, counted from the first entry ever indexed
+        self._base = 0
+        # Position of the first entry still in the list
+        self._start = 0
+
+    def sync(self, entries):
+        token = entries.change_token
+        if token == self._token:
+            return
+        if self._token is None:
+            self._rebuild(entries)
+            return
+
+        logs_id, rewrite_count, appended_count, dropped_count = token
+        last_logs_id, last_rewrite_count, last_appended_count, last_dropped_count = self._token
+        dropped = dropped_count - last_dropped_count
+        if logs_id != last_logs_id or rewrite_count != last_rewrite_count or dropped > len(self):
+            self._rebuild(entries)
+            return
+
+        self._start += dropped
+        while len(self._blocks) > 0 and self._base + self.block_size <= self._start:
+            del self._blocks[0]
+            self._base += self.block_size
+        appended = min(appended_count - last_appended_count, len(entries))
+        self._add(entries[len(entries) - appended:])
+        self._token = token
+
+    def _rebuild(self, entries):
+        self._reset()
+        self._add(entries)
+        self._token = entries.change_token
+
+    def _add(self, entries):
+        entry_text = self.entry_text
+        for entry in entries:
+            self._tail.append(entry_text(entry).lower())
+            if len(self._tail) == self.block_size:
+                self._blocks.append(self._join(self._tail))
+                self._tail = []
+        self._tail_block = None
+
+    @staticmethod
+    def _join(texts):
+        starts = array('l')
+        position = 0
+        for text in texts:
+            starts.append(position)
+            position += len(text) + 1
+        return ENTRY_SEPARATOR.join(texts), starts
+
+    def invalidate(self):
+        self._token = None
+
+    def __len__(self):
+        return self._base + len(self._blocks) * self.block_size + len(self._tail) - self._start
+
+    def find_last(self, query, before=None):
+        """Returns the index of the newest entry before `before` that contains `query`, or None"""
+        query = query.lower()
+        if len(query) == 0 or ENTRY_SEPARATOR in query:
+            return None
+        before = len(self) if before is None else min(before, len(self))
+        # Positions counted from the first entry ever indexed
+        start = self._start
+        stop = self._start + before
+        if self._tail_block is None:
+            self._tail_block = self._join(self._tail)
+        segments = [(self._base + len(self._blocks) * self.block_size, self._tail_block)]
+        segments += (
+            (self._base + i * self.block_size, self._blocks[i])
+            for i in range(len(self._blocks) - 1, -1, -1)
+        )
+        for segment_start, (text, starts) in segments:
+            if len(starts) == 0 or segment_start >= stop:
+                continue
+            if segment_start + len(starts) <= start:
+                break
+            first = max(start - segment_start, 0)
+            last = stop - segment_start
+            text_start = starts[first] if first < len(starts) else len(text)
+            text_end = starts[last] - 1 if last < len(starts) else len(text)
+            position = text.rfind(query, text_start, text_end)
+            if position >= 0:
+                return segment_start + bisect_right(starts, position) - 1 - self._start
+        return None
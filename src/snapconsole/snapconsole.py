@@ -1,15 +1,31 @@
 import curses
 import asyncio
-from contextlib import suppress
+import math
+import re
+import sys
+from collections import OrderedDict
+from itertools import chain
+from contextlib import ExitStack, contextmanager, suppress
 from enum import Enum
 from typing import Callable, NamedTuple, Optional, Union
 from dataclasses import dataclass
 
+from .cellwidth import char_widths, strip_unprintable
+from .ingest import LogBackpressure, LogQueue
+from .logfilter import LogFilter
+from .pane import PANE_SIDES, LogPane, dock_panes, draw_row
+from .archive import ArchivedLogs, LogArchive
+from .redraw import AsyncRedrawScheduler, BlockingRedrawScheduler
+from .scrollback import LineIndex
+from .search import TextIndex
+from .stats import RenderStats
+from .styledline import StyledLine
 from .textbox import Textbox
+from .wrapcache import WrapCache
 from .wrappedlist import WrappedListDescriptor
 
 LogSubEntry = Union[int, str]
-LogEntry = Union[str, list[LogSubEntry]]
+LogEntry = Union[str, list[LogSubEntry], StyledLine]
 LogEntrySplitter = Callable[[LogEntry, int], list[LogEntry]]
 
 def split_and_keep(input_str: str, sep=None, maxsplit=-1):
@@ -35,56 +51,87 @@ def split_list(input_list: list, sep=None):
     result.append(input_list[cur_index:])
     return result
 
+# Runs of characters that `curses.ascii.isprint` rejects, apart from new lines
+NON_PRINTABLE_RE = re.compile('[^\x20-\x7e\n]+')
+
 def default_log_splitter(log_entry: LogEntry, col: int):
     if isinstance(log_entry, str):
         log_entry = [log_entry]
-    
-    # Split new lines in text
-    temp = []
+
+    # Split new lines, filter non-printable characters and wrap to `col` in a single pass
+    result = []
+    cur_line = []
+    cur_line_len = 0
     for log_sub_entry in log_entry:
         if isinstance(log_sub_entry, int):
-            temp.append(log_sub_entry)
+            cur_line.append(log_sub_entry)
             continue
-        temp += split_and_keep(log_sub_entry, '\n')
-    log_entry = temp
+        if not (log_sub_entry.isascii() and log_sub_entry.isprintable()):
+            log_sub_entry = NON_PRINTABLE_RE.sub('', log_sub_entry)
+        for i, text in enumerate(log_sub_entry.split('\n')):
+            if i > 0:
+                # The line length carries over new lines, same as it always has
+                result.append(cur_line)
+                cur_line = []
+            pos = 0
+            while pos < len(text):
+                cur_slice = text[pos:pos + col - cur_line_len]
+                cur_line.append(cur_slice)
+                cur_line_len += len(cur_slice)
+                pos += len(cur_slice)
+                if cur_line_len == col:
+                    if pos < len(text):
+                        result.append(cur_line)
+                        cur_line = []
+                    cur_line_len = 0
+    result.append(cur_line)
+    return result
 
-    # Filter non-printable characters
-    temp = []
-    for log_sub_entry in log_entry:
-        if isinstance(log_sub_entry, int) or log_sub_entry == '\n':
-            temp.append(log_sub_entry)
-            continue
-        temp.append(''.join(filter(curses.ascii.isprint, log_sub_entry)))
-    log_entry = temp
+def unicode_log_splitter(log_entry: LogEntry, col: int):
+    # Like `default_log_splitter`, but keeps non-ASCII text and wraps by terminal cell width,
+    # so wide characters take two cells and combining characters stay with the character before
+    if isinstance(log_entry, str):
+        log_entry = [log_entry]
 
-    # Split lines by line length
-    temp = []
+    result = []
+    cur_line = []
     cur_line_len = 0
     for log_sub_entry in log_entry:
-        if isinstance(log_sub_entry, int) or log_sub_entry in ('', '\n'):
-            temp.append(log_sub_entry)
+        if isinstance(log_sub_entry, int):
+            cur_line.append(log_sub_entry)
             continue
-        while len(log_sub_entry) > 0:
-            sliced_len = col - cur_line_len
-            cur_slice = log_sub_entry[:sliced_len]
-            cur_line_len += len(cur_slice)
-            temp.append(cur_slice)
-
-            log_sub_entry = log_sub_entry[sliced_len:]
-            if cur_line_len == col:
-                if len(log_sub_entry) > 0:
-                    temp.append('\n')
+        for i, text in enumerate(log_sub_entry.split('\n')):
+            if i > 0:
+                result.append(cur_line)
+                cur_line = []
                 cur_line_len = 0
-    log_entry = temp
-
-    result = split_list(log_entry, '\n')
-
-    # Filter empty entries
-    temp = []
-    for line in result:
-        temp.append(list(filter(lambda l: isinstance(l, int) or len(l) > 0, line)))
-    result = temp
-
+            text = strip_unprintable(text)
+            if text.isascii():
+                pos = 0
+                while pos < len(text):
+                    if cur_line_len >= col:
+                        result.append(cur_line)
+                        cur_line = []
+                        cur_line_len = 0
+                    cur_slice = text[pos:pos + col - cur_line_len]
+                    cur_line.append(cur_slice)
+                    cur_line_len += len(cur_slice)
+                    pos += len(cur_slice)
+                continue
+            line_start = 0
+            for pos, ch_width in enumerate(char_widths(text)):
+                # Wrap before a character that does not fit, unless it is the first on its line
+                if ch_width > 0 and cur_line_len > 0 and cur_line_len + ch_width > col:
+                    if pos > line_start:
+                        cur_line.append(text[line_start:pos])
+                    result.append(cur_line)
+                    cur_line = []
+                    cur_line_len = 0
+                    line_start = pos
+                cur_line_len += ch_width
+            if line_start < len(text):
+                cur_line.append(text[line_start:])
+    result.append(cur_line)
     return result
 
 def process_line(log_entry: LogEntry, col: int, log_splitter: LogEntrySplitter):
@@ -100,6 +147,68 @@ def process_line(log_entry: LogEntry, col: int, log_splitter: LogEntrySplitter):
                 last_attr = segment
     return new_lines
 
+def log_entry_text(log_entry: LogEntry):
+    # Text of a log without its attributes
+    if isinstance(log_entry, str):
+        return log_entry
+    if isinstance(log_entry, StyledLine):
+        return log_entry.text
+    return ''.join(sub_entry for sub_entry in log_entry if isinstance(sub_entry, str))
+
+def line_to_row(line):
+    # Converts a processed line into a tuple of (attr, text) runs, which can be compared between frames
+    if isinstance(line, str):
+        line = [line]
+    row = []
+    cur_attr = curses.A_NORMAL
+    for segment in line:
+        if isinstance(segment, int):
+            cur_attr = segment
+        elif len(segment) > 0:
+            row.append((cur_attr, segment))
+    return tuple(row)
+
+def process_rows(log_entry: LogEntry, col: int, log_splitter: LogEntrySplitter):
+    if isinstance(log_entry, StyledLine):
+        return styled_line_rows(log_entry, col, log_splitter)
+    return [line_to_row(line) for line in process_line(log_entry, col, log_splitter)]
+
+def styled_line_rows(styled_line: StyledLine, col: int, log_splitter: LogEntrySplitter):
+    # Same rows as `process_rows` gives for the list form of the line, but wrapped straight from its
+    # runs when the splitter is a built-in one and the text is printable ASCII
+    text = styled_line.text
+    builtin = log_splitter is default_log_splitter or log_splitter is unicode_log_splitter
+    if col < 1 or not builtin or not (text.isascii() and text.isprintable()):
+        return [line_to_row(line) for line in process_line(styled_line, col, log_splitter)]
+    # `unicode_log_splitter` wraps before text that does not fit, while `default_log_splitter`
+    # only wraps a segment that goes past the end of the line
+    wrap_before = log_splitter is unicode_log_splitter
+    rows = []
+    row = []
+    line_len = 0
+    attr = curses.A_NORMAL
+    start = 0
+    for end, next_attr in chain(styled_line.iter_runs(), ((len(text), None),)):
+        pos = start
+        while pos < end:
+            if wrap_before and line_len >= col:
+                rows.append(tuple(row))
+                row = []
+                line_len = 0
+            stop = min(end, pos + col - line_len)
+            row.append((attr, text[pos:stop]))
+            line_len += stop - pos
+            pos = stop
+            if not wrap_before and line_len == col:
+                if pos < end:
+                    rows.append(tuple(row))
+                    row = []
+                line_len = 0
+        start = end
+        attr = next_attr
+    rows.append(tuple(row))
+    return rows
+
 @dataclass
 class WindowCoords:
     y: int
@@ -116,6 +225,51 @@ class WindowCoords:
             self.y + self.height - 1, self.x + self.width - 1
         )
 
+@dataclass
+class ScreenLayout:
+    # Where every window goes for one screen size and alignment, worked out once per resize
+    size: tuple[int, int]
+    display: WindowCoords
+    arrow: WindowCoords
+    text: WindowCoords
+    # Coords of every pane that fits by name, and the border lines around them
+    panes: dict
+    borders: list
+    # Size the display pad ended up with, which curses leaves as it was if the resize failed
+    display_size: tuple[int, int] = (0, 0)
+    # A blank row for every line of the display pad, sliced to pad out the logs
+    blank_rows: list = None
+
+@dataclass
+class DisplayFrame:
+    # What was drawn on the display pad, used to decide whether the next frame can scroll the logs
+    size: tuple[int, int]
+    logs_align_position: 'LogsAlignPosition'
+    header_lines: list
+    footer_lines: list
+    # Runs drawn on each row of the pad
+    rows: list
+    logs_token: tuple
+    # Position of the oldest visible log counted from the first log ever appended
+    first_visible_log: int
+    logs_filled: bool
+    log_height: int
+    scroll_offset: int
+
+@dataclass
+class SearchState:
+    # 'history' searches the command history, 'logs' searches the logs
+    target: str
+    query: str = ''
+    # Index of the current match in the searched list
+    match: Optional[int] = None
+    # Restored when the search is cancelled
+    saved_command_index: int = 0
+    saved_scroll_offset: int = 0
+    saved_query: str = ''
+    saved_log_filter: Optional[LogFilter] = None
+    saved_log_filter_predicate: Optional[Callable] = None
+
 def fill_pad(pad):
     print('pad size', pad.getmaxyx())
     for y in range(pad.getmaxyx()[0]):
@@ -126,6 +280,26 @@ def fill_pad(pad):
 ConsoleSize = NamedTuple('ConsoleSize', width=int, height=int)
 HANDLE_CH_NO_CH = object()
 HANDLE_CH_CONTINUE = object()
+MOUSE_SCROLL_LINES = 3
+# Seconds between checks for logs posted from other threads while blocked on input
+POSTED_LOGS_POLL_INTERVAL = 1 / 60
+# Longest time between checks for posted logs once the last checks found none
+POSTED_LOGS_IDLE_POLL_INTERVAL = 0.25
+# Seconds between reads while waiting for async input. Resizes reach curses as a signal rather than
+# as input on stdin, so they are only picked up by the next read
+RESIZE_POLL_INTERVAL = 0.25
+# Seconds to wait after a resize for the rest of a burst of resizes, which are handled as one
+RESIZE_DEBOUNCE_INTERVAL = 0.1
+# Longest a burst of resizes can hold back drawing, so the display keeps up while an edge is dragged
+RESIZE_MAX_DELAY = 0.5
+# Number of widths to keep the scrollback line index of, so switching between sizes is instant
+LINE_INDEX_WIDTHS = 2
+# Seconds between redraws of the stats footer while nothing else is drawn
+STATS_REFRESH_INTERVAL = 1
+# Seconds between reads for event loops that cannot watch stdin
+ASYNC_INPUT_POLL_INTERVAL = 0.01
+# Number of logs checked against the log filter between input reads, to count the hidden logs
+LOG_FILTER_CHECK_CHUNK = 5000
 
 class LogsAlignPosition(Enum):
     BOTTOM = 'bottom'
@@ -136,10 +310,10 @@ class TextboxAlignPosition(Enum):
     TOP = 'top'
 
 class SnapConsole:
-    logs = WrappedListDescriptor('_noutrefresh_display')
+    logs = WrappedListDescriptor('_noutrefresh_display', 'max_logs', '_archive_logs')
     header = WrappedListDescriptor('_noutrefresh_display')
     footer = WrappedListDescriptor('_noutrefresh_display')
-    command_history = WrappedListDescriptor('_handle_command_history_changed')
+    command_history = WrappedListDescriptor('_handle_command_history_changed', 'command_store_count')
 
     def __init__(
         self,
@@ -148,8 +322,24 @@ class SnapConsole:
         logs_align_position: LogsAlignPosition = LogsAlignPosition.BOTTOM,
         textbox_align_position: TextboxAlignPosition = TextboxAlignPosition.BOTTOM,
         resize_callback: Optional[Callable[[ConsoleSize], None]] = None,
+        max_fps: Optional[float] = 60,
+        coalesce_redraws: bool = True,
+        max_logs: Optional[int] = None,
+        stats_callback: Optional[Callable[[RenderStats], None]] = None,
+        show_stats: bool = False,
+        log_archive: Optional[LogArchive] = None,
+        max_pending_logs: Optional[int] = None,
+        log_backpressure: LogBackpressure = LogBackpressure.DROP_OLDEST,
+        log_block_timeout: Optional[float] = None,
     ):
-        self.command_store_count = command_store_count
+        self._command_store_count = command_store_count
+        self._max_logs = max_logs
+        # Logs evicted by `max_logs` are moved here, and can still be scrolled back to
+        self._log_archive = log_archive
+        self._archived_logs = None
+        if log_archive is not None:
+            self._archived_logs = ArchivedLogs(log_archive, lambda: self.logs)
+            log_archive.on_clear = self._noutrefresh_display
         self.log_splitter = log_splitter
         self.resize_callback = resize_callback
         self._logs_align_position = logs_align_position
@@ -159,10 +349,53 @@ class SnapConsole:
         self.header = []
         self.footer = []
 
+        # None while the command being typed is only kept in the textbox, so keys do not have to
+        # copy the whole line out of it
         self._current_command = ''
         self._current_command_index = 0
         self._command_history = []
 
+        self.stats = RenderStats()
+        # Called with `stats` after every frame, to export them
+        self.stats_callback = stats_callback
+        self._show_stats = show_stats
+        # When the stats footer was last drawn
+        self._stats_drawn_at = None
+        self._wrap_cache = WrapCache(self._process_rows)
+        self._last_frame = None
+        # Number of wrapped log lines between the bottom of the display and the newest log
+        self._scroll_offset = 0
+        self._panes = OrderedDict()
+        # Layout of the screen, kept until the next resize or alignment change
+        self._layout = None
+        # Whether the logs, header or footer changed since the display was last drawn
+        self._display_dirty = True
+        # Whether the textpad changed since the screen was last updated
+        self._screen_pending = False
+        self._line_index = LineIndex()
+        # Line indexes by width, most recently used last
+        self._line_indexes = OrderedDict()
+        # When the pending resize is handled, or None if there is none
+        self._resize_due = None
+        self._resize_deadline = None
+        # Logs posted from other threads, at most `max_pending_logs` of them waiting to be drawn
+        self._log_queue = LogQueue(max_pending_logs, log_backpressure, log_block_timeout)
+        # Seconds until the blocking input loop checks for posted logs again, None until a log is posted
+        self._posted_logs_wait = None
+        self._sources = []
+        self._history_text_index = TextIndex()
+        self._log_text_index = TextIndex(log_entry_text)
+        self._search = None
+        self._log_filter = None
+        # The filter from `set_log_filter`, and the query of the last Ctrl-S filter on top of it
+        self._log_filter_predicate = None
+        self._log_search_query = ''
+        # Whether the log filter ran out of checks before the last frame was filled
+        self._logs_incomplete = False
+        # Outside the async loop, the last frame of a burst stays pending until the next change,
+        # input read or flush, unless `coalesce_redraws` is turned off
+        self._redraw_scheduler = BlockingRedrawScheduler(self._draw_frame, max_fps, coalesce=coalesce_redraws)
+
     def __enter__(self):
         self.start()
         return self
@@ -171,6 +404,7 @@ class SnapConsole:
         self.stop()
 
     def start(self):
+        self._log_queue.open()
         self._enter_curses()
 
         self.displaypad = curses.newpad(1, 1)
@@ -183,6 +417,12 @@ class SnapConsole:
         self.do_draw()
 
     def stop(self):
+        for source in list(self._sources):
+            self.detach_source(source)
+        # Nothing drains posted logs from here on, so threads waiting to post must not wait forever
+        self._log_queue.close()
+        # A frame left pending on the event loop would bring the screen back after it is closed
+        self._redraw_scheduler.cancel()
         self._exit_curses()
     
     def _enter_curses(self):
@@ -192,6 +432,8 @@ class SnapConsole:
         curses.cbreak()
         self.stdscr.keypad(True)
         curses.curs_set(1)
+        # Mouse wheel scrolls back through the logs
+        curses.mousemask(curses.BUTTON4_PRESSED | getattr(curses, 'BUTTON5_PRESSED', 0))
         
         curses.start_color()
         curses.use_default_colors()
@@ -202,60 +444,98 @@ class SnapConsole:
         curses.nocbreak()
         curses.endwin()
 
-    def _get_coords(self, window_type):
+    def _compute_layout(self):
         scr_height, scr_width = self.stdscr.getmaxyx()
-        if window_type == 'display':
-            return WindowCoords(
-                y=1 if self.textbox_align_position == TextboxAlignPosition.TOP else 0,
-                x=0,
-                height=scr_height - 1,
-                width=scr_width,
-            )
-        elif window_type == 'arrow':
-            return WindowCoords(
-                y=0 if self.textbox_align_position == TextboxAlignPosition.TOP else scr_height - 1,
-                x=0,
-                height=1,
-                width=2,
-            )
-        elif window_type == 'text':
-            return WindowCoords(
-                y=0 if self.textbox_align_position == TextboxAlignPosition.TOP else scr_height - 1,
-                x=2,
-                height=1,
-                width=scr_width - 2,
-            )
+        textbox_top = self.textbox_align_position == TextboxAlignPosition.TOP
+        textbox_y = 0 if textbox_top else scr_height - 1
+        # The area above or below the textbox is split between the panes and the display
+        pane_coords, borders, (y, x, height, width) = dock_panes(
+            1 if textbox_top else 0, 0, scr_height - 1, scr_width, self._panes.values()
+        )
+        return ScreenLayout(
+            size=(scr_height, scr_width),
+            display=WindowCoords(y=y, x=x, height=height, width=width),
+            arrow=WindowCoords(y=textbox_y, x=0, height=1, width=2),
+            text=WindowCoords(y=textbox_y, x=2, height=1, width=scr_width - 2),
+            panes={name: WindowCoords(*coords) for name, coords in pane_coords.items()},
+            borders=borders,
+        )
+
+    def _get_layout(self):
+        if self._layout is None:
+            self._init_size()
+        return self._layout
 
     def _init_size(self):
+        # Works out the layout for the current screen size, and resizes the pads to it
+        self._layout = layout = self._compute_layout()
         with suppress(curses.error):
-            window_coords = self._get_coords('display')
-            self.displaypad.resize(window_coords.height, window_coords.width)
-            window_coords = self._get_coords('arrow')
-            self.arrowpad.resize(window_coords.height, window_coords.width)
-            window_coords = self._get_coords('text')
-            self.textpadpad.resize(window_coords.height, window_coords.width)
+            self.displaypad.resize(layout.display.height, layout.display.width)
+            self.arrowpad.resize(layout.arrow.height, layout.arrow.width)
+            self.textpadpad.resize(layout.text.height, layout.text.width)
+            self.textpad.render()
+            for name, pane in self._panes.items():
+                if name in layout.panes:
+                    pane.resize(layout.panes[name].height, layout.panes[name].width)
+                else:
+                    pane.hide()
+        layout.display_size = self.displaypad.getmaxyx()
+        layout.blank_rows = [()] * layout.display_size[0]
 
     def handle_resize(self):
+        self._resize_due = None
         self._init_size()
         self.do_draw()
         if self.resize_callback is not None:
-            height, width = self.stdscr.getmaxyx()
+            height, width = self._layout.size
             self.resize_callback(ConsoleSize(width=width, height=height))
         
     def do_draw(self):
+        # Everything is redrawn, so a pending frame would be redundant
+        self._redraw_scheduler.cancel()
+        # stdscr only holds the pane borders, and goes first so the pads are copied over it
+        self._draw_pane_borders()
+        self.stdscr.noutrefresh()
         self.refresh_display()
+        self._refresh_panes(redraw=True)
         self.refresh_arrow()
         self.refresh_textpad()
+        self._update_screen()
 
-    def refresh_display(self):
-        self.displaypad.erase()
+    def redraw_screen(self):
+        # Clears the terminal and draws everything again, for when it was drawn over
+        self.stdscr.clearok(True)
+        self.do_draw()
+
+    def _update_screen(self):
+        # Sends everything copied to the virtual screen since the last update to the terminal.
+        # The textpad is copied last, as the terminal cursor goes to the last window copied
+        self.textpadpad.noutrefresh(*self._get_layout().text.noutrefresh_coords)
+        curses.doupdate()
+        self.stats.curses_calls += 2
+        self._screen_pending = False
+
+    def _process_rows(self, log_entry, width, log_splitter):
+        start = self.stats.clock()
+        rows = process_rows(log_entry, width, log_splitter)
+        self.stats.record_wrap(len(rows), self.stats.clock() - start)
+        return rows
 
-        height, width = self.displaypad.getmaxyx()
+    def refresh_display(self):
+        frame_start = self.stats.clock()
+        self._display_dirty = False
+        curses_calls = 0
+        layout = self._get_layout()
+        height, width = layout.display_size
 
+        footer = self.footer
+        if self._show_stats:
+            footer = list(footer) + [self.stats.summary()]
+            self._stats_drawn_at = frame_start
         height_left = height
         footer_lines = []
-        for entry in reversed(self.footer):
-            footer_lines += reversed(process_line(entry, width, self.log_splitter))
+        for entry in reversed(footer):
+            footer_lines += reversed(self._wrap_cache.get_lines(entry, width, self.log_splitter))
             if len(footer_lines) >= height_left:
                 break
         footer_lines = footer_lines[:height_left]
@@ -264,75 +544,459 @@ class SnapConsole:
 
         header_lines = []
         for entry in self.header:
-            header_lines += process_line(entry, width, self.log_splitter)
+            header_lines += self._wrap_cache.get_lines(entry, width, self.log_splitter)
             if len(header_lines) >= height_left:
                 break
         header_lines = header_lines[:height_left]
         height_left -= len(header_lines)
 
+        logs = self._displayed_logs()
+        check_limit = None
+        if self._log_filter is not None:
+            self._log_filter.sync(logs)
+            # Logs that still have to be checked after this are left for the next frames
+            check_limit = self._log_filter.check_count + LOG_FILTER_CHECK_CHUNK
+        self._logs_incomplete = False
+        last_frame = self._last_frame
+        # Logs appended since the last frame, only used if nothing else was edited in between
+        appended_count = logs.appended_count - last_frame.logs_token[2] if last_frame is not None else 0
+        if self._scroll_offset > 0:
+            self._update_scroll_offset(logs, height_left, width)
         log_lines = []
-        for entry in reversed(self.logs):
-            log_lines += reversed(process_line(entry, width, self.log_splitter))
-            if len(log_lines) >= height_left:
-                break
+        new_line_count = 0
+        visible_count = 0
+        if self._scroll_offset > 0:
+            # Walk back from the log at the bottom of the scrolled view
+            end_line = self._line_index.total_lines - self._scroll_offset
+            index, line_in_entry = self._line_index.locate(end_line - 1)
+            entry_lines = self._wrap_cache.get_lines(logs[index], width, self.log_splitter)
+            log_lines += reversed(entry_lines[:line_in_entry + 1])
+            while len(log_lines) < height_left:
+                previous_index = self._previous_log(logs, index)
+                if previous_index < 0:
+                    break
+                index = previous_index
+                log_lines += reversed(self._wrap_cache.get_lines(logs[index], width, self.log_splitter))
+            visible_count = len(logs) - index
+        else:
+            index = len(logs)
+            while len(log_lines) < height_left:
+                previous_index = self._previous_log(logs, index, check_limit)
+                if previous_index is None:
+                    self._logs_incomplete = True
+                    break
+                index = previous_index
+                if index < 0:
+                    break
+                log_lines += reversed(self._wrap_cache.get_lines(logs[index], width, self.log_splitter))
+                if len(logs) - index <= appended_count:
+                    new_line_count = len(log_lines)
+            visible_count = len(logs) - max(index, 0)
+        logs_filled = len(log_lines) >= height_left
         log_lines = log_lines[:height_left]
         log_lines.reverse()
+        log_height = height_left
         height_left -= len(log_lines)
 
+        # Only entries drawn on this frame stay cached
+        self._wrap_cache.sweep()
+
         if self.logs_align_position == LogsAlignPosition.TOP:
-            lines = header_lines + log_lines + ([[]] * height_left) + footer_lines
+            lines = header_lines + log_lines + layout.blank_rows[:height_left] + footer_lines
+        else:
+            lines = header_lines + layout.blank_rows[:height_left] + log_lines + footer_lines
+
+        frame = DisplayFrame(
+            size=(height, width),
+            logs_align_position=self.logs_align_position,
+            header_lines=header_lines,
+            footer_lines=footer_lines,
+            logs_token=logs.change_token,
+            first_visible_log=logs.dropped_count + len(logs) - visible_count,
+            rows=lines,
+            logs_filled=logs_filled,
+            log_height=log_height,
+            scroll_offset=self._scroll_offset,
+        )
+        if last_frame is None or last_frame.size != frame.size:
+            self.displaypad.erase()
+            curses_calls += 1
+            drawn_rows = list(layout.blank_rows)
         else:
-            lines = header_lines + ([[]] * height_left) + log_lines + footer_lines
-
-        for y, line in enumerate(lines):
-            cur_attr = curses.A_NORMAL
-            cur_x = 0
-            if isinstance(line, str):
-                line = [line]
-            for segment in line:
-                if isinstance(segment, int):
-                    cur_attr = segment
+            drawn_rows = list(last_frame.rows)
+            if self._can_scroll_logs(last_frame, frame) and 0 < new_line_count < log_height:
+                # Only logs were appended, so scroll them up and leave the new lines to be drawn below
+                log_top = len(header_lines)
+                log_bottom = log_top + log_height - 1
+                self.displaypad.scrollok(True)
+                self.displaypad.setscrreg(log_top, log_bottom)
+                self.displaypad.scroll(new_line_count)
+                self.displaypad.scrollok(False)
+                curses_calls += 4
+                drawn_rows[log_top:log_bottom + 1] = drawn_rows[log_top + new_line_count:log_bottom + 1] + layout.blank_rows[:new_line_count]
+
+        # Only rows that differ from what is already on the pad are drawn
+        for y, row in enumerate(lines):
+            if row != drawn_rows[y]:
+                draw_row(self.displaypad, y, row, width)
+                curses_calls += 2 + len(row)
+        self._last_frame = frame
+
+        self.displaypad.noutrefresh(*layout.display.noutrefresh_coords)
+        self.stats.curses_calls += curses_calls + 1
+        self.stats.record_frame(frame_start, self.stats.clock())
+        if self.stats_callback is not None:
+            self.stats_callback(self.stats)
+
+    def _can_scroll_logs(self, last_frame, frame):
+        if last_frame is None:
+            return False
+        if frame.logs_align_position != LogsAlignPosition.BOTTOM or last_frame.logs_align_position != LogsAlignPosition.BOTTOM:
+            return False
+        if frame.size != last_frame.size or not frame.logs_filled or not last_frame.logs_filled:
+            return False
+        if frame.header_lines != last_frame.header_lines or frame.footer_lines != last_frame.footer_lines:
+            return False
+        if frame.scroll_offset != 0 or last_frame.scroll_offset != 0:
+            return False
+        # The logs must be the same list with only appends since the last frame, and every
+        # log that was visible must still be there
+        logs_id, rewrite_count, _, dropped_count = frame.logs_token
+        last_logs_id, last_rewrite_count, _, _ = last_frame.logs_token
+        if logs_id != last_logs_id or rewrite_count != last_rewrite_count:
+            return False
+        return dropped_count <= last_frame.first_visible_log
+
+    def _update_scroll_offset(self, logs, log_height, width):
+        added_lines = self._sync_line_index(logs, width)
+        if added_lines:
+            # Keep the view on the same lines while new logs come in
+            self._scroll_offset += added_lines
+        max_offset = max(self._line_index.total_lines - max(log_height, 1), 0)
+        self._scroll_offset = min(self._scroll_offset, max_offset)
+
+    def set_log_filter(self, log_filter):
+        # Only displays logs that match `log_filter`, while `logs` keeps every log.
+        # `log_filter` is either a regex, searched for in the text of each log, or a function
+        # that takes a log entry and returns whether to display it. None displays every log
+        if isinstance(log_filter, str):
+            log_filter = re.compile(log_filter)
+        if isinstance(log_filter, re.Pattern):
+            pattern = log_filter
+            log_filter = lambda log_entry: pattern.search(log_entry_text(log_entry)) is not None
+        self._log_filter_predicate = log_filter
+        self._apply_log_filter()
+
+    def _apply_log_filter(self):
+        # Displays the logs that pass the filter from `set_log_filter` and contain the Ctrl-S query
+        predicate = self._log_filter_predicate
+        query = self._log_search_query.lower()
+        if len(query) > 0:
+            base_predicate = predicate
+            predicate = lambda log_entry: (
+                query in log_entry_text(log_entry).lower()
+                and (base_predicate is None or base_predicate(log_entry))
+            )
+        self._log_filter = None if predicate is None else LogFilter(predicate)
+        self._scroll_offset = 0
+        self._noutrefresh_display()
+
+    @property
+    def hidden_log_count(self):
+        # Number of logs hidden by the log filter. Logs are counted a chunk at a time while waiting
+        # for input, so right after setting a filter on a large backlog the count is still going up
+        if self._log_filter is None:
+            return 0
+        self._log_filter.sync(self._displayed_logs())
+        return self._log_filter.hidden_count
+
+    def _check_log_filter(self):
+        # Returns True if there are still logs to check
+        if self._log_filter is None:
+            return False
+        if self._logs_incomplete:
+            # The next frame picks up where the last one stopped
+            self._noutrefresh_display()
+            return True
+        logs = self._displayed_logs()
+        self._log_filter.sync(logs)
+        return self._log_filter.check(logs, LOG_FILTER_CHECK_CHUNK)
+
+    def _displayed_logs(self):
+        # The logs the display scrolls through, including the archived ones
+        if self._archived_logs is not None:
+            return self._archived_logs
+        return self.logs
+
+    def _archive_logs(self, log_entries):
+        if self._log_archive is not None:
+            self._log_archive.extend(log_entries)
+
+    def _defer_resize(self):
+        # Dragging a terminal edge sends a burst of resizes, only the size after the burst is drawn
+        now = self.stats.clock()
+        if self._resize_due is None:
+            self._resize_deadline = now + RESIZE_MAX_DELAY
+        self._resize_due = min(now + RESIZE_DEBOUNCE_INTERVAL, self._resize_deadline)
+
+    def _time_until_resize(self):
+        if self._resize_due is None:
+            return None
+        return max(self._resize_due - self.stats.clock(), 0)
+
+    def _maybe_handle_resize(self):
+        if self._time_until_resize() == 0:
+            self.handle_resize()
+
+    def _sync_line_index(self, logs, width):
+        # Returns the number of lines appended since the last sync, or None if the index was
+        # rebuilt or switched to another width
+        switched = width != self._line_index.width
+        if switched:
+            self._use_line_index(width)
+        if self._log_filter is not None:
+            self._log_filter.sync(logs)
+        added_lines = self._line_index.sync(logs, width, self.log_splitter, self._log_filter)
+        return None if switched else added_lines
+
+    def _use_line_index(self, width):
+        # The line indexes of the last few widths are kept, so switching back to one of them
+        # only has to catch up with the logs appended since
+        if self._line_index.width is not None:
+            self._line_indexes[self._line_index.width] = self._line_index
+        line_index = self._line_indexes.pop(width, None)
+        self._line_index = LineIndex() if line_index is None else line_index
+        self._line_indexes[width] = self._line_index
+        while len(self._line_indexes) > LINE_INDEX_WIDTHS:
+            self._line_indexes.popitem(last=False)
+
+    def _previous_log(self, logs, index, check_limit=None):
+        # Index of the last displayed log before `index`, -1 if there is none, or None if the log
+        # filter ran out of checks for this frame
+        if self._log_filter is None:
+            return index - 1
+        return self._log_filter.previous_shown(logs, index, check_limit)
+
+    def scroll_logs(self, line_count):
+        # Positive counts scroll back to older logs, negative counts scroll towards the newest logs
+        if self._scroll_offset == 0:
+            # Lines appended while following the newest logs should not move the view
+            self._sync_line_index(self._displayed_logs(), self._get_layout().display_size[1])
+        self._scroll_offset = max(self._scroll_offset + line_count, 0)
+        self._noutrefresh_display()
+
+    @property
+    def scroll_offset(self):
+        return self._scroll_offset
+
+    @scroll_offset.setter
+    def scroll_offset(self, new_val: int):
+        self.scroll_logs(new_val - self._scroll_offset)
+
+    def add_pane(
+        self,
+        name: str,
+        side: str = 'right',
+        size: Union[int, float] = 0.5,
+        max_logs: Optional[int] = None,
+        log_splitter: Optional[LogEntrySplitter] = None,
+        logs_align_position: LogsAlignPosition = LogsAlignPosition.BOTTOM,
+    ):
+        # Adds a pane with its own logs, which takes `size` rows or columns from `side` of the
+        # display. `size` can also be a float, for a fraction of the space left by earlier panes
+        if name in self._panes:
+            raise ValueError(f'A pane named {name!r} already exists')
+        if side not in PANE_SIDES:
+            raise ValueError(f'side should be one of {", ".join(PANE_SIDES)}')
+        pane = LogPane(
+            name,
+            side,
+            size,
+            self._process_rows,
+            log_splitter or self.log_splitter,
+            max_logs=max_logs,
+            align_top=logs_align_position == LogsAlignPosition.TOP,
+            on_change=self._request_frame,
+        )
+        self._panes[name] = pane
+        self._handle_layout_changed()
+        return pane
+
+    def remove_pane(self, name: str):
+        del self._panes[name]
+        self._handle_layout_changed()
+
+    @property
+    def panes(self):
+        return dict(self._panes)
+
+    def _handle_layout_changed(self):
+        try:
+            self.stdscr
+        except AttributeError:
+            return
+        self.stdscr.erase()
+        self._init_size()
+        self.do_draw()
+
+    def _draw_pane_borders(self):
+        if len(self._panes) == 0:
+            return
+        for y, x, length, vertical in self._get_layout().borders:
+            with suppress(curses.error):
+                if vertical:
+                    self.stdscr.vline(y, x, curses.ACS_VLINE, length)
                 else:
-                    with suppress(curses.error):
-                        self.displaypad.insnstr(y, cur_x, segment, width - cur_x, cur_attr)
-                    cur_x += len(segment)
+                    self.stdscr.hline(y, x, curses.ACS_HLINE, length)
 
-        self.displaypad.overwrite(self.stdscr, *self._get_coords('display').noutrefresh_coords)
+    def _refresh_panes(self, redraw=False):
+        # Draws the panes whose logs changed, or every pane if `redraw`
+        if len(self._panes) == 0:
+            return
+        pane_coords = self._get_layout().panes
+        for name, pane in self._panes.items():
+            if pane.pad is None or not (pane.dirty or redraw):
+                continue
+            self.stats.curses_calls += pane.draw() + 1
+            pane.pad.noutrefresh(*pane_coords[name].noutrefresh_coords)
 
     def refresh_arrow(self):
         with suppress(curses.error):
             self.arrowpad.addstr(0, 0, '> ')
 
-        self.arrowpad.overwrite(self.stdscr, *self._get_coords('arrow').noutrefresh_coords)
+        self.arrowpad.noutrefresh(*self._get_layout().arrow.noutrefresh_coords)
 
     def refresh_textpad(self):
-        y, x = self.textpadpad.getyx()
-        coords = self._get_coords('text')
-
-        self.textpadpad.overwrite(self.stdscr, *coords.noutrefresh_coords)
-        self.stdscr.move(y + coords.y, x + coords.x)
+        # The textpad reaches the terminal on the next screen update, after the key is handled
+        self.textpadpad.noutrefresh(*self._get_layout().text.noutrefresh_coords)
+        self._screen_pending = True
 
     def _noutrefresh_display(self):
         # Private wrapped for `noutrefresh_display`, silently returns if console has not been initialized
         # Calling the public one is preferred so it fails noisily
+        self._display_dirty = True
+        self._request_frame()
+
+    def _request_frame(self):
         try:
             self.stdscr
         except AttributeError:
             return
-        self.refresh_display()
+        self.stats.display_changes += 1
+        self._redraw_scheduler.mark_dirty()
+
+    @contextmanager
+    def batch(self):
+        # Holds back callbacks for logs, header, footer and command_history until the scope exits,
+        # so each list that was edited calls its callback once
+        with ExitStack() as stack:
+            for lst in (self.logs, self.header, self.footer, self.command_history):
+                stack.enter_context(lst.batch())
+            for pane in self._panes.values():
+                stack.enter_context(pane.logs.batch())
+            yield self
+
+    def _draw_frame(self):
+        if self._resize_due is not None:
+            # The pads still have the old size, everything is drawn once the resize is handled
+            return
+        # The display and panes are copied to the virtual screen, and reach the terminal in one update
+        if self._display_dirty or self._show_stats:
+            self.refresh_display()
+        self._refresh_panes()
+        self._update_screen()
+
+    @property
+    def show_stats(self):
+        return self._show_stats
+
+    @show_stats.setter
+    def show_stats(self, new_val: bool):
+        # Shows a footer line with live frame rate and timings
+        self._show_stats = new_val
+        self._noutrefresh_display()
+
+    def _time_until_posted_logs(self, drained_count):
+        # Posted logs are checked for every frame while they keep coming, and less and less often
+        # once they stop, as a blocking read cannot be woken by the posting thread
+        if drained_count > 0 or len(self._log_queue) > 0:
+            self._posted_logs_wait = self._redraw_scheduler.frame_interval or POSTED_LOGS_POLL_INTERVAL
+        elif self._posted_logs_wait is not None:
+            self._posted_logs_wait = min(self._posted_logs_wait * 2, POSTED_LOGS_IDLE_POLL_INTERVAL)
+        elif self._log_queue.posted_count > 0:
+            # Logs posted before the input loop started were already drained
+            self._posted_logs_wait = POSTED_LOGS_IDLE_POLL_INTERVAL
+        return self._posted_logs_wait
+
+    def _time_until_stats_refresh(self):
+        # Seconds until the stats footer is out of date, or None if it is not shown or already
+        # about to be drawn
+        if not self._show_stats or self._stats_drawn_at is None or self._display_dirty:
+            return None
+        return max(self._stats_drawn_at + STATS_REFRESH_INTERVAL - self.stats.clock(), 0)
+
+    def _maybe_refresh_stats(self):
+        # Keeps the stats footer live while nothing else is drawn
+        if self._time_until_stats_refresh() == 0:
+            self._noutrefresh_display()
+
+    def flush(self):
+        # Draws pending log, header and footer changes immediately instead of waiting for the next frame
+        self._drain_posted_logs()
+        self._redraw_scheduler.flush()
+
+    def post_log(self, entry: LogEntry):
+        # Thread-safe way to append a log, the log shows up once the UI loop drains the posted logs.
+        # Unlike `logs.append`, this never calls curses, so it can be called from any thread.
+        # Once `max_pending_logs` logs are waiting, `log_backpressure` decides what happens to the rest
+        self._log_queue.post(entry)
+
+    def attach_source(self, source):
+        # Streams logs into `logs` from `source`, such as a `FileTailSource` or `ProcessSource`.
+        # Sources that read from files, pipes or sockets run on the running event loop, so they
+        # have to be attached from a coroutine. Returns `source`
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            pass
+        else:
+            # Batches from the sources are drawn from the event loop at the frame rate
+            self._use_async_redraw()
+        source.start(self)
+        self._sources.append(source)
+        return source
+
+    def detach_source(self, source):
+        self._sources.remove(source)
+        source.close()
+
+    def _drain_posted_logs(self):
+        entries = self._log_queue.drain()
+        if len(entries) > 0:
+            # A single extend, so the whole drain is drawn in one frame
+            self.logs.extend(entries)
+        return len(entries)
 
     def _add_command_history(self, cmd):
-        if len(self._command_history) > 0 and self._command_history[-1] == cmd:
+        # command_history is bounded by command_store_count, so the oldest command is evicted in place
+        command_history = self.command_history
+        if len(command_history) > 0 and command_history[-1] == cmd:
             return
-        self._command_history.append(cmd)
-        if len(self._command_history) > self.command_store_count:
-            self._command_history = self._command_history[-self.command_store_count:]
+        command_history.append(cmd)
 
     def _handle_input_ch(self, input_ch):
         if input_ch == -1:
             return HANDLE_CH_NO_CH
         elif input_ch == curses.KEY_RESIZE:
-            self.handle_resize()
+            self._defer_resize()
+            return HANDLE_CH_CONTINUE
+        elif self._search is not None and input_ch != curses.KEY_MOUSE:
+            return self._handle_search_ch(input_ch)
+        elif input_ch == curses.ascii.DC2: # ^r
+            self._start_search('history')
+            return HANDLE_CH_CONTINUE
+        elif input_ch == curses.ascii.DC3: # ^s
+            self._start_search('logs')
             return HANDLE_CH_CONTINUE
         elif input_ch in (curses.KEY_UP, curses.KEY_DOWN):
             if input_ch == curses.KEY_DOWN and self.current_command_index > 0:
@@ -340,49 +1004,258 @@ class SnapConsole:
             elif input_ch == curses.KEY_UP and self.current_command_index < len(self.command_history):
                 self.current_command_index += 1
             return HANDLE_CH_CONTINUE
+        elif input_ch in (curses.KEY_PPAGE, curses.KEY_NPAGE):
+            page = max(self._last_frame.log_height - 1, 1) if self._last_frame is not None else 1
+            self.scroll_logs(page if input_ch == curses.KEY_PPAGE else -page)
+            return HANDLE_CH_CONTINUE
+        elif input_ch == curses.KEY_MOUSE:
+            with suppress(curses.error):
+                _, _, _, _, button_state = curses.getmouse()
+                if button_state & curses.BUTTON4_PRESSED:
+                    self.scroll_logs(MOUSE_SCROLL_LINES)
+                elif button_state & getattr(curses, 'BUTTON5_PRESSED', 0):
+                    self.scroll_logs(-MOUSE_SCROLL_LINES)
+            return HANDLE_CH_CONTINUE
         elif input_ch in (ord('\r'), ord('\n'), curses.PADENTER):
             cmd = self.textpad.gather()
             self._add_command_history(cmd)
+            self._current_command = ''
             self._current_command_index = 0
-            self.textpadpad.erase()
-            self.textpadpad.move(0, 0)
+            self.textpad.clear()
             self.refresh_textpad()
             return cmd
+        elif curses.ascii.isprint(input_ch):
+            # Pastes arrive as a burst of keys, which are inserted together and drawn once
+            self.textpad.insert_text(self._read_printable_burst(input_ch))
+            self._current_command = None
+            self._current_command_index = 0
+            self.refresh_textpad()
+            return HANDLE_CH_CONTINUE
+        elif input_ch == curses.ascii.FF: # ^l
+            self.redraw_screen()
+            return HANDLE_CH_CONTINUE
         else:
-            self.stdscr.touchwin()
+            change_count = self.textpad.editor.change_count
             self.textpad.do_command(input_ch)
-            if curses.ascii.isprint(input_ch):
-                cursor_pos = self.textpadpad.getyx()
-                self._current_command = self.textpad.gather()
+            if self.textpad.editor.change_count != change_count:
+                # Editing a command from the history turns it into the current command
+                self._current_command = None
                 self._current_command_index = 0
-                self.textpadpad.move(*cursor_pos)
             self.refresh_textpad()
             return HANDLE_CH_CONTINUE
 
+    def _start_search(self, target):
+        # The search prompt replaces the text in the textbox
+        self._save_current_command()
+        self._search = SearchState(
+            target=target,
+            saved_command_index=self._current_command_index,
+            saved_scroll_offset=self._scroll_offset,
+            saved_query=self._log_search_query,
+            saved_log_filter=self._log_filter,
+            saved_log_filter_predicate=self._log_filter_predicate,
+        )
+        if target == 'logs':
+            # Picks up the filter from the last search, so the view does not change
+            self._search.query = self._log_search_query
+            self._search.match = self._find_log(self._search.query)
+        self._show_search()
+
+    def _handle_search_ch(self, input_ch):
+        search = self._search
+        if input_ch in (curses.ascii.DC2, curses.ascii.DC3):
+            # Pressing the search key again moves on to the next older match
+            if search.match is not None:
+                self._run_search(before=search.match)
+        elif curses.ascii.isprint(input_ch):
+            search.query += self._read_printable_burst(input_ch)
+            self._run_search()
+        elif input_ch in (curses.ascii.BS, curses.KEY_BACKSPACE):
+            search.query = search.query[:-1]
+            self._run_search()
+        elif input_ch in (curses.ascii.BEL, curses.ascii.ESC): # ^g, escape
+            self._end_search(accept=False)
+        elif input_ch in (ord('\r'), ord('\n'), curses.PADENTER):
+            self._end_search(accept=True)
+        else:
+            # Any other key accepts the match, and is then handled as usual
+            self._end_search(accept=True)
+            return self._handle_input_ch(input_ch)
+        return HANDLE_CH_CONTINUE
+
+    def _run_search(self, before=None):
+        search = self._search
+        if search.target == 'history':
+            index = self._history_text_index
+            index.sync(self.command_history)
+            match = index.find_last(search.query, before)
+        else:
+            if before is None and search.query != self._log_search_query:
+                # Only the logs containing the query are displayed while it is typed
+                self._log_search_query = search.query
+                self._apply_log_filter()
+            match = self._find_log(search.query, before)
+        if match is not None or before is None:
+            search.match = match
+        if search.target == 'logs' and before is not None and match is not None:
+            # Searching again scrolls back to older matches
+            self._scroll_to_log(match)
+        self._show_search()
+
+    def _find_log(self, query, before=None):
+        # Newest log before `before` that contains `query`, skipping logs hidden by `set_log_filter`
+        index = self._log_text_index
+        index.sync(self.logs)
+        predicate = self._log_filter_predicate
+        match = index.find_last(query, before)
+        while match is not None and predicate is not None and not predicate(self.logs[match]):
+            match = index.find_last(query, match)
+        return match
+
+    def _show_search(self):
+        search = self._search
+        failed = 'failed ' if search.match is None and len(search.query) > 0 else ''
+        action = 'filter' if search.target == 'logs' else 'search'
+        prompt = f"({failed}{action} {search.target})'{search.query}'"
+        if search.target == 'history' and search.match is not None:
+            prompt += ': ' + self.command_history[search.match]
+        self.textpad.set_text(prompt)
+        self.refresh_textpad()
+
+    def _end_search(self, accept):
+        search = self._search
+        self._search = None
+        if search.target == 'history' and accept and search.match is not None:
+            self._current_command_index = len(self.command_history) - search.match
+        elif search.target == 'history':
+            self._current_command_index = search.saved_command_index
+        elif not accept and self._log_filter_predicate is search.saved_log_filter_predicate:
+            # Back to the logs and scroll position from before the search
+            self._log_search_query = search.saved_query
+            self._log_filter = search.saved_log_filter
+            self._scroll_offset = search.saved_scroll_offset
+            self._noutrefresh_display()
+        elif not accept:
+            # `set_log_filter` was called during the search, so only the query is taken back
+            self._log_search_query = search.saved_query
+            self._apply_log_filter()
+        self._update_cur_command()
+
+    def _scroll_to_log(self, index):
+        # Scrolls so `index` of `logs` is the newest log in view
+        logs = self._displayed_logs()
+        index += len(logs) - len(self.logs)
+        self._sync_line_index(logs, self._get_layout().display_size[1])
+        self._scroll_offset = self._line_index.total_lines - self._line_index.lines_before(index + 1)
+        self._noutrefresh_display()
+
+    def _read_printable_burst(self, input_ch):
+        # Reads the printable keys that are already waiting after `input_ch`, without blocking
+        burst = [chr(input_ch)]
+        self.stdscr.timeout(0)
+        while True:
+            next_ch = self.stdscr.getch()
+            if next_ch == -1:
+                break
+            if not curses.ascii.isprint(next_ch):
+                # Left for the input loop to handle
+                curses.ungetch(next_ch)
+                break
+            burst.append(chr(next_ch))
+        return ''.join(burst)
+
     def get_input(self):
         self.stdscr.nodelay(True) # blocking read
-        self.stdscr.timeout(-1) # blocking read
+        # A blocking getch cannot be woken by other threads, so posted logs are polled for instead
+        self._log_queue.wakeup = None
         while True:
+            drained_count = self._drain_posted_logs()
+            self._maybe_handle_resize()
+            self._maybe_refresh_stats()
+            self._redraw_scheduler.maybe_flush()
+            # Block until a key is pressed, or until a pending frame or resize is due
+            frame_wait = self._redraw_scheduler.time_until_frame()
+            for wait in (
+                self._time_until_posted_logs(drained_count), self._time_until_resize(),
+                self._time_until_stats_refresh(),
+            ):
+                if wait is not None:
+                    frame_wait = wait if frame_wait is None else min(frame_wait, wait)
+            if self._check_log_filter():
+                frame_wait = 0
+            if frame_wait is None:
+                self.stdscr.timeout(-1) # blocking read
+            else:
+                self.stdscr.timeout(max(1, math.ceil(frame_wait * 1000)))
             input_ch = self.stdscr.getch()
+            input_time = self.stats.clock()
             result = self._handle_input_ch(input_ch)
-            if result is HANDLE_CH_CONTINUE:
+            if self._screen_pending:
+                self._update_screen()
+            if result is HANDLE_CH_CONTINUE or result is HANDLE_CH_NO_CH:
                 continue
             else:
+                self.stats.record_input(self.stats.clock() - input_time)
                 return result
 
     async def async_get_input(self):
+        self._use_async_redraw()
+        loop = asyncio.get_running_loop()
+        self._log_queue.wakeup = lambda: loop.call_soon_threadsafe(self._drain_posted_logs)
         self.stdscr.nodelay(True) # non-blocking read
         self.stdscr.timeout(0) # non-blocking read
         while True:
+            self._drain_posted_logs()
+            self._maybe_refresh_stats()
+            self._redraw_scheduler.maybe_flush()
             input_ch = self.stdscr.getch()
+            input_time = self.stats.clock()
             result = self._handle_input_ch(input_ch)
+            if self._screen_pending:
+                self._update_screen()
             if result is HANDLE_CH_CONTINUE:
                 continue
             elif result is HANDLE_CH_NO_CH:
-                await asyncio.sleep(0.01)
+                # Resizes only reach curses on a read, so a pending resize is handled once a read
+                # comes back without another one
+                self._maybe_handle_resize()
+                wait = RESIZE_POLL_INTERVAL
+                for due in (self._time_until_resize(), self._time_until_stats_refresh()):
+                    if due is not None:
+                        wait = min(wait, due)
+                if self._check_log_filter():
+                    await asyncio.sleep(0)
+                else:
+                    await self._wait_for_input(loop, wait)
             else:
+                self.stats.record_input(self.stats.clock() - input_time)
                 return result
 
+    async def _wait_for_input(self, loop, timeout=RESIZE_POLL_INTERVAL):
+        # Sleeps until stdin has input to read or `timeout` passes, instead of polling for input
+        input_ready = loop.create_future()
+        stdin_fd = sys.stdin.fileno()
+        try:
+            loop.add_reader(stdin_fd, lambda: input_ready.done() or input_ready.set_result(None))
+        except NotImplementedError:
+            await asyncio.sleep(min(timeout, ASYNC_INPUT_POLL_INTERVAL))
+            return
+        try:
+            await asyncio.wait_for(input_ready, timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            loop.remove_reader(stdin_fd)
+
+    def _use_async_redraw(self):
+        # Pending frames are drawn from the event loop instead of waiting for the next mutation
+        scheduler = self._redraw_scheduler
+        if isinstance(scheduler, AsyncRedrawScheduler):
+            return
+        self._redraw_scheduler = AsyncRedrawScheduler(self._draw_frame, scheduler.max_fps)
+        if scheduler.dirty:
+            self._redraw_scheduler.mark_dirty()
+
     def __iter__(self):
         return self
 
@@ -402,6 +1275,7 @@ class SnapConsole:
     @logs_align_position.setter
     def logs_align_position(self, new_val: LogsAlignPosition):
         self._logs_align_position = new_val
+        self._layout = None
         self.do_draw()
 
     @property
@@ -414,9 +1288,39 @@ class SnapConsole:
         self._init_size()
         self.do_draw()
 
+    @property
+    def max_logs(self):
+        return self._max_logs
+
+    @max_logs.setter
+    def max_logs(self, new_val: Optional[int]):
+        self._max_logs = new_val
+        # Rewrap the logs with the new bound
+        self.logs = list(self.logs)
+
+    @property
+    def log_archive(self):
+        return self._log_archive
+
+    @property
+    def log_queue(self):
+        # Counts of the logs posted, dropped and blocked on, for monitoring the console itself
+        return self._log_queue
+
+    @property
+    def command_store_count(self):
+        return self._command_store_count
+
+    @command_store_count.setter
+    def command_store_count(self, new_val: int):
+        self._command_store_count = new_val
+        self.command_history = list(self.command_history)
+
     @property
     def current_command(self):
         if self._current_command_index == 0:
+            if self._current_command is None:
+                return self.textpad.gather()
             return self._current_command
         else:
             return self.command_history[-self._current_command_index]
@@ -435,12 +1339,18 @@ class SnapConsole:
     def current_command_index(self, command_index):
         if command_index < 0 or command_index > len(self.command_history):
             raise ValueError('Value should be between 0 to len(self.command_history) inclusive')
+        if self._current_command_index == 0:
+            # The command from the history replaces the text in the textbox
+            self._save_current_command()
         self._current_command_index = command_index
         self._update_cur_command()
 
+    def _save_current_command(self):
+        # While it is typed, the current command is only kept in the textbox
+        if self._current_command is None:
+            self._current_command = self.textpad.gather()
+
     def _handle_command_history_changed(self):
-        if len(self._command_history) > self.command_store_count:
-            self._command_history = self._command_history[-self.command_store_count:]
         self._current_command_index = 0
         self._update_cur_command()
 
@@ -449,9 +1359,5 @@ class SnapConsole:
             self.stdscr
         except AttributeError:
             return
-        cur_command = self.current_command
-        max_width = self.textpadpad.getmaxyx()[1]
-        self.textpadpad.erase()
-        self.textpadpad.insnstr(0, 0, cur_command, max_width)
-        self.textpadpad.move(0, min(len(cur_command), max_width - 1))
+        self.textpad.set_text(self.current_command)
         self.refresh_textpad()
\ No newline at end of file
@@ -0,0 +1,236 @@
+import asyncio
+import codecs
+import logging
+import os
+from contextlib import suppress
+
+# Bytes read at a time, so a burst of output is split and appended as one batch
+READ_CHUNK_SIZE = 64 * 1024
+# Longest line kept waiting for its end, after which it is logged as it is
+MAX_LINE_LENGTH = 64 * 1024
+# Seconds between checks of a tailed file for new lines
+FILE_POLL_INTERVAL = 0.1
+
+
+class LineBuffer:
+    """Splits a stream of bytes into lines as it is read
+
+    Only the bytes passed to each `feed` are searched for line breaks, and the partial line at the
+    end is kept until the rest of it arrives. Characters split across reads are decoded once whole."""
+
+    def __init__(self, encoding='utf-8'):
+        self._decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+        self._partial = ''
+
+    def feed(self, data):
+        lines = self._decoder.decode(data).split('\n')
+        if self._partial:
+            lines[0] = self._partial + lines[0]
+        self._partial = lines.pop()
+        if len(self._partial) > MAX_LINE_LENGTH:
+            lines.append(self._partial)
+            self._partial = ''
+        return [line[:-1] if line.endswith('\r') else line for line in lines]
+
+    def flush(self):
+        # The partial line left once the stream has ended
+        partial = self._partial + self._decoder.decode(b'', final=True)
+        self._partial = ''
+        return [partial] if partial else []
+
+
+class LogSource:
+    """Streams lines into a console's logs from a task on the running event loop
+
+    Attach sources with `SnapConsole.attach_source` from a coroutine, such as the one running
+    `async for user_input in console`. Each read is split into lines and appended in one batch, so
+    a burst of output is drawn in a single frame. Subclasses implement `_read`."""
+
+    def __init__(self, name):
+        self.name = name
+        self._console = None
+        self._task = None
+
+    def start(self, console):
+        self._console = console
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self):
+        try:
+            await self._read()
+        except asyncio.CancelledError:
+            raise
+        except Exception as error:
+            # Nothing waits on the task, so the error is logged where it can be seen
+            self._push([f'{self.name}: {error}'])
+
+    async def _read(self):
+        raise NotImplementedError
+
+    def _push(self, lines):
+        if len(lines) > 0:
+            self._console.logs.extend(lines)
+
+    async def _read_stream(self, reader, encoding):
+        lines = LineBuffer(encoding)
+        while True:
+            data = await reader.read(READ_CHUNK_SIZE)
+            if not data:
+                break
+            self._push(lines.feed(data))
+        self._push(lines.flush())
+
+
+class FileTailSource(LogSource):
+    """Lines appended to the file at `path`, like `tail -F`
+
+    Only lines written after the source is attached are logged, unless `from_start`. The file is
+    polled for new lines every `poll_interval` seconds, and followed when it is truncated, or
+    replaced by log rotation."""
+
+    def __init__(self, path, from_start=False, poll_interval=FILE_POLL_INTERVAL, encoding='utf-8'):
+        super().__init__(str(path))
+        self.path = path
+        self.from_start = from_start
+        self.poll_interval = poll_interval
+        self.encoding = encoding
+
+    async def _read(self):
+        file = None
+        lines = None
+        # Only the file there when the source is attached is read from its end
+        seek_end = not self.from_start
+        try:
+            while True:
+                if file is None:
+                    with suppress(FileNotFoundError):
+                        file = open(self.path, 'rb', buffering=0)
+                        if seek_end:
+                            file.seek(0, os.SEEK_END)
+                        lines = LineBuffer(self.encoding)
+                    seek_end = False
+                if file is not None:
+                    while True:
+                        data = file.read(READ_CHUNK_SIZE)
+                        if not data:
+                            break
+                        self._push(lines.feed(data))
+                        # Lets input and drawing through while catching up on a large file
+                        await asyncio.sleep(0)
+                    if self._check_replaced(file):
+                        self._push(lines.flush())
+                        file.close()
+                        file = None
+                        continue
+                await asyncio.sleep(self.poll_interval)
+        finally:
+            if file is not None:
+                file.close()
+
+    def _check_replaced(self, file):
+        # Returns whether the path now points at another file, and rewinds a truncated file
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return True
+        if stat.st_ino != os.fstat(file.fileno()).st_ino:
+            return True
+        if stat.st_size < file.tell():
+            file.seek(0)
+        return False
+
+
+class ProcessSource(LogSource):
+    """Output of a command run as a subprocess, with its stderr merged into its stdout
+
+    Takes the same arguments as `asyncio.create_subprocess_exec`. The process is terminated when
+    the source is closed."""
+
+    def __init__(self, program, *args, encoding='utf-8', **kwargs):
+        super().__init__(' '.join(str(arg) for arg in (program,) + args))
+        self.args = (program,) + args
+        self.encoding = encoding
+        self.kwargs = kwargs
+        self.process = None
+
+    async def _read(self):
+        self.process = await asyncio.create_subprocess_exec(
+            *self.args,
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT,
+            **self.kwargs,
+        )
+        try:
+            await self._read_stream(self.process.stdout, self.encoding)
+            await self.process.wait()
+        finally:
+            if self.process.returncode is None:
+                with suppress(ProcessLookupError):
+                    self.process.terminate()
+
+
+class UnixSocketSource(LogSource):
+    """Lines written by any program that connects to a Unix socket created at `path`
+
+    Each connection is read on its own, so lines from different connections are never mixed. The
+    socket file is removed when the source is closed."""
+
+    def __init__(self, path, encoding='utf-8'):
+        super().__init__(str(path))
+        self.path = path
+        self.encoding = encoding
+        self._writers = set()
+
+    async def _read(self):
+        server = await asyncio.start_unix_server(self._handle_connection, self.path)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            for writer in list(self._writers):
+                writer.close()
+            with suppress(FileNotFoundError):
+                os.unlink(self.path)
+
+    async def _handle_connection(self, reader, writer):
+        self._writers.add(writer)
+        try:
+            with suppress(ConnectionError):
+                await self._read_stream(reader, self.encoding)
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+
+class LoggingSource(logging.Handler):
+    """A `logging` handler that logs every record to the console, a log per line
+
+    Records are posted with `SnapConsole.post_log`, so they can be emitted from any thread, and
+    are formatted by the handler's formatter. Unlike the other sources, it does not need an event
+    loop. The handler is added to `logger`, the root logger by default, when attached."""
+
+    def __init__(self, logger=None, level=logging.NOTSET):
+        super().__init__(level)
+        self.logger = logging.getLogger() if logger is None else logger
+        self._console = None
+
+    def start(self, console):
+        self._console = console
+        self.logger.addHandler(self)
+
+    def close(self):
+        self.logger.removeHandler(self)
+        super().close()
+
+    def emit(self, record):
+        try:
+            for line in self.format(record).split('\n'):
+                self._console.post_log(line)
+        except Exception:
+            self.handleError(record)
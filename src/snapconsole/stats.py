@@ -0,0 +1,107 @@
+import time
+from collections import deque
+
+
+class RenderStats:
+    """Counters and timings of the console's rendering and input handling
+
+    Totals count from when the console was created. Timings are kept for the last `window`
+    frames and inputs, which is what the averages and percentiles are computed over."""
+
+    def __init__(self, window=1000, clock=time.perf_counter):
+        self.clock = clock
+        self.frames = 0
+        # Requests for a redraw, mostly from the logs, header and footer callbacks
+        self.display_changes = 0
+        self.lines_wrapped = 0
+        self.wrap_time = 0.0
+        self.curses_calls = 0
+        self.inputs = 0
+        self._frame_times = deque(maxlen=window)
+        self._input_latencies = deque(maxlen=window)
+        # When each of the frames in the last second finished drawing
+        self._recent_frames = deque()
+
+    def record_frame(self, start, end):
+        self.frames += 1
+        self._frame_times.append(end - start)
+        self._recent_frames.append(end)
+        self._forget_old_frames(end)
+
+    def record_wrap(self, line_count, elapsed):
+        self.lines_wrapped += line_count
+        self.wrap_time += elapsed
+
+    def record_input(self, latency):
+        self.inputs += 1
+        self._input_latencies.append(latency)
+
+    def _forget_old_frames(self, now):
+        while len(self._recent_frames) > 0 and self._recent_frames[0] <= now - 1:
+            self._recent_frames.popleft()
+
+    @property
+    def fps(self):
+        # Frames drawn in the last second
+        self._forget_old_frames(self.clock())
+        return len(self._recent_frames)
+
+    @property
+    def average_frame_time(self):
+        return _average(self._frame_times)
+
+    @property
+    def p99_frame_time(self):
+        return _percentile(self._frame_times, 0.99)
+
+    @property
+    def average_input_latency(self):
+        return _average(self._input_latencies)
+
+    @property
+    def p99_input_latency(self):
+        return _percentile(self._input_latencies, 0.99)
+
+    @property
+    def redraws_per_change(self):
+        # Below 1 when several edits were drawn in the same frame
+        if self.display_changes == 0:
+            return 0.0
+        return self.frames / self.display_changes
+
+    def as_dict(self):
+        return {
+            'frames': self.frames,
+            'fps': self.fps,
+            'average_frame_time': self.average_frame_time,
+            'p99_frame_time': self.p99_frame_time,
+            'display_changes': self.display_changes,
+            'redraws_per_change': self.redraws_per_change,
+            'lines_wrapped': self.lines_wrapped,
+            'wrap_time': self.wrap_time,
+            'curses_calls': self.curses_calls,
+            'inputs': self.inputs,
+            'average_input_latency': self.average_input_latency,
+            'p99_input_latency': self.p99_input_latency,
+        }
+
+    def summary(self):
+        # One line for the debug footer
+        return (
+            f'{self.fps} fps | frame {self.average_frame_time * 1000:.1f}ms '
+            f'p99 {self.p99_frame_time * 1000:.1f}ms | {self.curses_calls} calls | '
+            f'input p99 {self.p99_input_latency * 1000:.1f}ms'
+        )
+
+
+def _average(values):
+    if len(values) == 0:
+        return 0.0
+    return sum(values) / len(values)
+
+
+def _percentile(values, fraction):
+    if len(values) == 0:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(int(fraction * len(ordered)), len(ordered) - 1)]
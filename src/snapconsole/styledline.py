@@ -0,0 +1,80 @@
+import struct
+
+# An attribute run packed as the offset it starts at and the attribute
+RUN = struct.Struct('<Iq')
+# Packed runs shared between styled lines, as lines of the same shape have the same runs
+_shared_runs = {}
+MAX_SHARED_RUNS = 4096
+
+
+class StyledLine:
+    """A log entry built once from text and attributes, like the list form of `LogEntry`
+
+    The text is stored as one string, and the offsets at which attributes start are packed with
+    the attributes into one bytes object, which is shared with earlier lines that have the same
+    runs. Styled lines are immutable, so the wrap cache does not have to compare them against a
+    snapshot on every frame, and they are wrapped straight from their runs.
+
+        StyledLine('Status: ', curses.color_pair(1), 'OK', curses.A_NORMAL)
+    """
+
+    __slots__ = ('text', '_runs')
+
+    def __init__(self, *segments):
+        texts = []
+        runs = []
+        offset = 0
+        for segment in segments:
+            if isinstance(segment, int):
+                runs.append(RUN.pack(offset, segment))
+            else:
+                texts.append(segment)
+                offset += len(segment)
+        self.text = ''.join(texts)
+        runs = b''.join(runs)
+        if len(_shared_runs) >= MAX_SHARED_RUNS:
+            _shared_runs.clear()
+        self._runs = _shared_runs.setdefault(runs, runs)
+
+    @classmethod
+    def from_entry(cls, log_entry):
+        if isinstance(log_entry, cls):
+            return log_entry
+        if isinstance(log_entry, str):
+            return cls(log_entry)
+        return cls(*log_entry)
+
+    @property
+    def runs(self):
+        # Flat tuple of the offset each attribute starts at, followed by the attribute
+        return tuple(value for run in RUN.iter_unpack(self._runs) for value in run)
+
+    def iter_runs(self):
+        # Yields (offset, attr) for every attribute, in order
+        return RUN.iter_unpack(self._runs)
+
+    def __iter__(self):
+        # Yields the segments of the list form, so log splitters can take styled lines as they are
+        text = self.text
+        start = 0
+        for offset, attr in self.iter_runs():
+            if offset > start:
+                yield text[start:offset]
+                start = offset
+            yield attr
+        if start < len(text):
+            yield text[start:]
+
+    def to_entry(self):
+        return list(self)
+
+    def __eq__(self, other):
+        if not isinstance(other, StyledLine):
+            return NotImplemented
+        return self.text == other.text and self._runs == other._runs
+
+    def __hash__(self):
+        return hash((self.text, self._runs))
+
+    def __repr__(self):
+        return f'{type(self).__name__}({", ".join(repr(segment) for segment in self)})'
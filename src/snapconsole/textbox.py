@@ -1,154 +1,190 @@
-"""Pretty much an extension of curses.textpad.Textbox, but not quite the same
-https://github.com/python/cpython/blob/main/Lib/curses/textpad.py"""
-
-import curses
-import curses.ascii
-
-class Textbox:
-    def __init__(self, win, insert_mode=False):
-        self.win = win
-        self.insert_mode = insert_mode
-        self._update_max_yx()
-        self.stripspaces = 1
-        self.lastcmd = None
-        win.keypad(1)
-
-    def _update_max_yx(self):
-        maxy, maxx = self.win.getmaxyx()
-        self.maxy = maxy - 1
-        self.maxx = maxx - 1
-
-    def _end_of_line(self, y):
-        """Go to the location of the first blank on the given line,
-        returning the index of the last non-blank character."""
-        self._update_max_yx()
-        last = self.maxx
-        while True:
-            if curses.ascii.ascii(self.win.inch(y, last)) != curses.ascii.SP:
-                last = min(self.maxx, last+1)
-                break
-            elif last == 0:
-                break
-            last = last - 1
-        return last
-
-    def _insert_printable_char(self, ch):
-        self._update_max_yx()
-        (y, x) = self.win.getyx()
-        backyx = None
-        while y < self.maxy or x < self.maxx:
-            if self.insert_mode:
-                oldch = self.win.inch()
-            # The try-catch ignores the error we trigger from some curses
-            # versions by trying to write into the lowest-rightmost spot
-            # in the window.
-            try:
-                self.win.addch(ch)
-            except curses.error:
-                pass
-            if not self.insert_mode or not curses.ascii.isprint(oldch):
-                break
-            ch = oldch
-            (y, x) = self.win.getyx()
-            # Remember where to put the cursor back since we are in insert_mode
-            if backyx is None:
-                backyx = y, x
-
-        if backyx is not None:
-            self.win.move(*backyx)
-
-    def do_command(self, ch):
-        "Process a single editing command."
-        self._update_max_yx()
-        (y, x) = self.win.getyx()
-        self.lastcmd = ch
-        if curses.ascii.isprint(ch):
-            if y < self.maxy or x < self.maxx:
-                self._insert_printable_char(ch)
-        elif ch == curses.ascii.SOH:                           # ^a
-            self.win.move(y, 0)
-        elif ch in (curses.ascii.STX,curses.KEY_LEFT, curses.ascii.BS,curses.KEY_BACKSPACE):
-            if x > 0:
-                self.win.move(y, x-1)
-            elif y == 0:
-                pass
-            elif self.stripspaces:
-                self.win.move(y-1, self._end_of_line(y-1))
-            else:
-                self.win.move(y-1, self.maxx)
-            if ch in (curses.ascii.BS, curses.KEY_BACKSPACE):
-                self.win.delch()
-        elif ch in (curses.ascii.EOT, curses.ascii.DEL, curses.KEY_DC): # ^d, DEL, KEY_DC
-            self.win.delch()
-        elif ch == curses.ascii.ENQ:                           # ^e
-            if self.stripspaces:
-                self.win.move(y, self._end_of_line(y))
-            else:
-                self.win.move(y, self.maxx)
-        elif ch in (curses.ascii.ACK, curses.KEY_RIGHT):       # ^f
-            if x < self.maxx and (x < self._end_of_line(y) or not self.stripspaces):
-                self.win.move(y, x+1)
-            elif y == self.maxy:
-                self.win.move(y, x)
-            else:
-                self.win.move(y+1, 0)
-        elif ch == curses.ascii.BEL:                           # ^g
-            return 0
-        elif ch == curses.ascii.NL:                            # ^j
-            if self.maxy == 0:
-                return 0
-            elif y < self.maxy:
-                self.win.move(y+1, 0)
-        elif ch == curses.ascii.VT:                            # ^k
-            if x == 0 and self._end_of_line(y) == 0:
-                self.win.deleteln()
-            else:
-                # first undo the effect of self._end_of_line
-                self.win.move(y, x)
-                self.win.clrtoeol()
-        elif ch == curses.ascii.FF:                            # ^l
-            self.win.refresh()
-        elif ch in (curses.ascii.SO, curses.KEY_DOWN):         # ^n
-            if y < self.maxy:
-                self.win.move(y+1, x)
-                if x > self._end_of_line(y+1):
-                    self.win.move(y+1, self._end_of_line(y+1))
-        elif ch == curses.ascii.SI:                            # ^o
-            self.win.insertln()
-        elif ch in (curses.ascii.DLE, curses.KEY_UP):          # ^p
-            if y > 0:
-                self.win.move(y-1, x)
-                if x > self._end_of_line(y-1):
-                    self.win.move(y-1, self._end_of_line(y-1))
-        return 1
-
-    def gather(self):
-        "Collect and return the contents of the window."
-        result = ''
-        self._update_max_yx()
-        for y in range(self.maxy+1):
-            self.win.move(y, 0)
-            stop = self._end_of_line(y)
-            if stop == 0 and self.stripspaces:
-                continue
-            for x in range(self.maxx+1):
-                if self.stripspaces and x >= stop:
-                    break
-                result = result + chr(curses.ascii.ascii(self.win.inch(y, x)))
-            if self.maxy > 0:
-                result = result + '\n'
-
-        return result
-
-    def edit(self, validate=None):
-        "Edit in the widget window and collect the results."
-        while 1:
-            ch = self.win.getch()
-            if validate:
-                ch = validate(ch)
-            if not ch:
-                continue
-            if not self.do_command(ch):
-                break
-            self.win.refresh()
-        return self.gather()
\ No newline at end of file
+"""Pretty much an extension of curses.textpad.Textbox, but not quite the same
+https://github.com/python/cpython/blob/main/Lib/curses/textpad.py
+
+The text is kept in a LineEditor rather than read back from the window, and the
+window only shows the part of the line around the cursor."""
+
+import curses
+import curses.ascii
+
+class LineEditor:
+    """A single line of text with a cursor, stored as a gap buffer
+
+    Characters before the cursor are kept in order and characters after it in
+    reverse order, so typing, deleting and moving by one character are O(1)."""
+
+    def __init__(self, text=''):
+        self._before = list(text)
+        self._after = []
+        # Bumped by every edit of the text, so callers can tell it changed without comparing it
+        self.change_count = 0
+
+    def __len__(self):
+        return len(self._before) + len(self._after)
+
+    @property
+    def text(self):
+        return ''.join(self._before) + ''.join(reversed(self._after))
+
+    @text.setter
+    def text(self, text):
+        # Cursor goes to the end of the new text
+        self._before = list(text)
+        self._after = []
+        self.change_count += 1
+
+    @property
+    def cursor(self):
+        return len(self._before)
+
+    @cursor.setter
+    def cursor(self, cursor):
+        cursor = max(0, min(cursor, len(self)))
+        while len(self._before) > cursor:
+            self._after.append(self._before.pop())
+        while len(self._before) < cursor:
+            self._before.append(self._after.pop())
+
+    def substring(self, start, stop):
+        # Same as text[start:stop] for non-negative indices, without joining the whole line
+        split = len(self._before)
+        result = self._before[start:stop]
+        if stop > split:
+            after_len = len(self._after)
+            after_start = min(max(start - split, 0), after_len)
+            after_stop = stop - split
+            # `_after` is reversed, so its slice is taken from the end
+            result += reversed(self._after[max(after_len - after_stop, 0):after_len - after_start])
+        return ''.join(result)
+
+    def insert(self, text, overwrite=False):
+        if overwrite:
+            del self._after[max(len(self._after) - len(text), 0):]
+        self._before.extend(text)
+        self.change_count += 1
+
+    def delete_before(self):
+        if self._before:
+            self._before.pop()
+            self.change_count += 1
+
+    def delete_after(self):
+        if self._after:
+            self._after.pop()
+            self.change_count += 1
+
+    def delete_to_end(self):
+        if self._after:
+            self._after = []
+            self.change_count += 1
+
+    def move_left(self):
+        if self._before:
+            self._after.append(self._before.pop())
+
+    def move_right(self):
+        if self._after:
+            self._before.append(self._after.pop())
+
+    def move_home(self):
+        self.cursor = 0
+
+    def move_end(self):
+        self.cursor = len(self)
+
+
+class Textbox:
+    def __init__(self, win, insert_mode=False):
+        self.win = win
+        self.insert_mode = insert_mode
+        self.editor = LineEditor()
+        # Index of the first character shown in the window
+        self.scroll = 0
+        self._update_max_yx()
+        self.stripspaces = 1
+        self.lastcmd = None
+        win.keypad(1)
+
+    def _update_max_yx(self):
+        maxy, maxx = self.win.getmaxyx()
+        self.maxy = maxy - 1
+        self.maxx = maxx - 1
+
+    def _update_scroll(self):
+        # Keeps the cursor in view, the last cell of the window is left for the cursor at the end of the line
+        view_width = max(self.maxx, 1)
+        cursor = self.editor.cursor
+        if cursor < self.scroll:
+            self.scroll = cursor
+        elif cursor > self.scroll + view_width:
+            self.scroll = cursor - view_width
+        self.scroll = max(0, min(self.scroll, len(self.editor) - view_width + 1))
+
+    def render(self):
+        "Draw the visible part of the line into the window."
+        self._update_max_yx()
+        self._update_scroll()
+        self.win.erase()
+        visible = self.editor.substring(self.scroll, self.scroll + self.maxx)
+        if len(visible) > 0:
+            self.win.addnstr(0, 0, visible, self.maxx)
+        self.win.move(0, min(self.editor.cursor - self.scroll, self.maxx))
+
+    def set_text(self, text):
+        self.editor.text = text
+        self.scroll = 0
+        self.render()
+
+    def clear(self):
+        self.set_text('')
+
+    def insert_text(self, text):
+        "Insert a run of printable characters at the cursor."
+        self.editor.insert(text, overwrite=not self.insert_mode)
+        self.render()
+
+    def do_command(self, ch):
+        "Process a single editing command."
+        self.lastcmd = ch
+        editor = self.editor
+        if curses.ascii.isprint(ch):
+            editor.insert(chr(ch), overwrite=not self.insert_mode)
+        elif ch in (curses.ascii.SOH, curses.KEY_HOME):        # ^a
+            editor.move_home()
+        elif ch in (curses.ascii.STX,curses.KEY_LEFT):         # ^b
+            editor.move_left()
+        elif ch in (curses.ascii.BS,curses.KEY_BACKSPACE):
+            editor.delete_before()
+        elif ch in (curses.ascii.EOT, curses.ascii.DEL, curses.KEY_DC): # ^d, DEL, KEY_DC
+            editor.delete_after()
+        elif ch in (curses.ascii.ENQ, curses.KEY_END):         # ^e
+            editor.move_end()
+        elif ch in (curses.ascii.ACK, curses.KEY_RIGHT):       # ^f
+            editor.move_right()
+        elif ch in (curses.ascii.BEL, curses.ascii.NL):        # ^g, ^j
+            return 0
+        elif ch == curses.ascii.VT:                            # ^k
+            editor.delete_to_end()
+        elif ch == curses.ascii.FF:                            # ^l
+            self.win.refresh()
+        self.render()
+        return 1
+
+    def gather(self):
+        "Collect and return the contents of the line."
+        if self.stripspaces:
+            return self.editor.text.rstrip(' ')
+        return self.editor.text
+
+    def edit(self, validate=None):
+        "Edit in the widget window and collect the results."
+        while 1:
+            ch = self.win.getch()
+            if validate:
+                ch = validate(ch)
+            if not ch:
+                continue
+            if not self.do_command(ch):
+                break
+            self.win.refresh()
+        return self.gather()
@@ -0,0 +1,66 @@
+from collections import OrderedDict
+
+from .styledline import StyledLine
+
+
+class WrapCache:
+    """Caches the wrapped lines of log entries for the current width
+
+    Entries are keyed by identity and checked against a snapshot of their content, so
+    list entries that are edited in place are re-wrapped on the next lookup. Strings and styled
+    lines cannot be edited, so they need no snapshot. Entries that were not looked up since the
+    last `sweep` are evicted, so the cache only ever holds what was visible on the last frame.
+
+    The caches of the last `max_layouts` widths and log splitters are kept, so resizing back
+    to a recent width does not re-wrap anything."""
+
+    def __init__(self, process_entry, max_layouts=4):
+        # process_entry(log_entry, width, log_splitter) -> wrapped lines
+        self.process_entry = process_entry
+        self.max_layouts = max_layouts
+        self.width = None
+        self.log_splitter = None
+        self._entries = {}
+        self._used = set()
+        # Entries of the other recent layouts by (width, log_splitter), most recently used last
+        self._layouts = OrderedDict()
+
+    def _switch_layout(self, width, log_splitter):
+        if self.width is not None:
+            self._layouts[(self.width, self.log_splitter)] = self._entries
+        self._entries = self._layouts.pop((width, log_splitter), {})
+        self._used = set()
+        while len(self._layouts) >= self.max_layouts:
+            self._layouts.popitem(last=False)
+        self.width = width
+        self.log_splitter = log_splitter
+
+    def get_lines(self, log_entry, width, log_splitter):
+        if width != self.width or log_splitter is not self.log_splitter:
+            self._switch_layout(width, log_splitter)
+
+        key = id(log_entry)
+        snapshot = None if isinstance(log_entry, (str, StyledLine)) else tuple(log_entry)
+        cached = self._entries.get(key)
+        if cached is not None and cached[0] is log_entry and cached[1] == snapshot:
+            lines = cached[2]
+        else:
+            lines = self.process_entry(log_entry, width, log_splitter)
+            # Keep a reference to the entry so its id cannot be reused while cached
+            self._entries[key] = (log_entry, snapshot, lines)
+        self._used.add(key)
+        return lines
+
+    def sweep(self):
+        # Evict entries that were not looked up since the last sweep
+        if len(self._used) < len(self._entries):
+            self._entries = {key: self._entries[key] for key in self._used}
+        self._used = set()
+
+    def clear(self):
+        self._entries = {}
+        self._used = set()
+        self._layouts.clear()
+
+    def __len__(self):
+        return len(self._entries)
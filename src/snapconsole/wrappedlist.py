@@ -1,68 +1,160 @@
-class WrappedList(list):
+from contextlib import contextmanager
+from itertools import count
+
+from .ringlist import RingList
+
+# Identifies lists in change tokens, as the `id` of a freed list is given to the next one created
+_list_ids = count()
+
+
+def new_list_id():
+    return next(_list_ids)
+
+
+class BatchedCallback:
+    """Callback that can be held back while a batch of edits is made
+
+    The callback is called once when the outermost batch exits, if anything was edited."""
+
+    def __init__(self, callback):
+        self.callback = callback
+        self.depth = 0
+        self.changed = False
+
+    def __call__(self):
+        if self.depth > 0:
+            self.changed = True
+            return
+        self.callback()
+
+    @contextmanager
+    def batch(self):
+        self.depth += 1
+        try:
+            yield
+        finally:
+            self.depth -= 1
+            if self.depth == 0 and self.changed:
+                self.changed = False
+                self.callback()
+
+
+def _is_front_index(index, length):
+    if isinstance(index, slice):
+        start, _, step = index.indices(length)
+        return start == 0 and step == 1
+    return index in (0, -length)
+
+
+class ListChangesMixin:
+    """Calls the callback on edit and counts what kind of edits were made
+
+    Appends to the end and removals from the front are counted separately from other edits,
+    so that views of the list can be updated incrementally. Compare `change_token` between
+    updates: if only the appended and dropped counts moved, those are the only changes."""
+
+    def _init_callback(self, callback):
+        if not isinstance(callback, BatchedCallback):
+            callback = BatchedCallback(callback)
+        self.callback = callback
+        self.list_id = new_list_id()
+        self.appended_count = 0
+        self.dropped_count = 0
+        self.rewrite_count = 0
+
+    @property
+    def change_token(self):
+        return (self.list_id, self.rewrite_count, self.appended_count, self.dropped_count)
+
+    def _handle_change(self, appended=0, dropped=0):
+        if appended == 0 and dropped == 0:
+            self.rewrite_count += 1
+        self.appended_count += appended
+        self.dropped_count += dropped
+        self.callback()
+
+    @contextmanager
+    def batch(self):
+        """Calls the callback once for all edits made in this scope"""
+        with self.callback.batch():
+            yield self
+
+
+class WrappedList(ListChangesMixin, list):
     """Creates a list that calls a callback function on edit"""
 
     def __init__(self, callback, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.callback = callback
-        
+        self._init_callback(callback)
+
     def append(self, *args, **kwargs):
         result = super().append(*args, **kwargs)
-        self.callback()
+        self._handle_change(appended=1)
         return result
 
     def extend(self, *args, **kwargs):
+        old_len = len(self)
         result = super().extend(*args, **kwargs)
-        self.callback()
+        self._handle_change(appended=len(self) - old_len)
         return result
 
     def insert(self, *args, **kwargs):
         result = super().insert(*args, **kwargs)
-        self.callback()
+        self._handle_change()
         return result
 
     def remove(self, *args, **kwargs):
         result = super().remove(*args, **kwargs)
-        self.callback()
+        self._handle_change()
         return result
 
-    def pop(self, *args, **kwargs):
-        result = super().pop(*args, **kwargs)
-        self.callback()
+    def pop(self, index=-1):
+        is_front = _is_front_index(index, len(self))
+        result = super().pop(index)
+        if is_front:
+            self._handle_change(dropped=1)
+        else:
+            self._handle_change()
         return result
 
     def clear(self, *args, **kwargs):
         result = super().clear(*args, **kwargs)
-        self.callback()
+        self._handle_change()
         return result
 
     def sort(self, *args, **kwargs):
         result = super().sort(*args, **kwargs)
-        self.callback()
+        self._handle_change()
         return result
 
     def reverse(self, *args, **kwargs):
         result = super().reverse(*args, **kwargs)
-        self.callback()
+        self._handle_change()
         return result
 
     def __setitem__(self, *args, **kwargs):
         result = super().__setitem__(*args, **kwargs)
-        self.callback()
+        self._handle_change()
         return result
 
-    def __delitem__(self, *args, **kwargs):
-        result = super().__delitem__(*args, **kwargs)
-        self.callback()
+    def __delitem__(self, index):
+        old_len = len(self)
+        result = super().__delitem__(index)
+        if _is_front_index(index, old_len):
+            self._handle_change(dropped=old_len - len(self))
+        else:
+            self._handle_change()
         return result
 
     def __iadd__(self, *args, **kwargs):
+        old_len = len(self)
         result = super().__iadd__(*args, **kwargs)
-        self.callback()
+        self._handle_change(appended=len(self) - old_len)
         return result
 
     def __imul__(self, *args, **kwargs):
         result = super().__imul__(*args, **kwargs)
-        self.callback()
+        self._handle_change()
         return result
 
     def __get__(self, obj, type=None):
@@ -75,29 +167,142 @@ class WrappedList(list):
         print('__delete__', self, obj)
 
 
+class WrappedRingList(ListChangesMixin, RingList):
+    """Creates a bounded list that calls a callback function on edit"""
+
+    def __init__(self, callback, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._init_callback(callback)
+
+    def _handle_appended(self, old_len, old_evicted_count):
+        evicted = self.evicted_count - old_evicted_count
+        self._handle_change(appended=len(self) - old_len + evicted, dropped=evicted)
+
+    @RingList.maxlen.setter
+    def maxlen(self, maxlen):
+        old_evicted_count = self.evicted_count
+        RingList.maxlen.fset(self, maxlen)
+        self._handle_change(dropped=self.evicted_count - old_evicted_count)
+
+    def append(self, *args, **kwargs):
+        old_len, old_evicted_count = len(self), self.evicted_count
+        result = super().append(*args, **kwargs)
+        self._handle_appended(old_len, old_evicted_count)
+        return result
+
+    def extend(self, *args, **kwargs):
+        old_len, old_evicted_count = len(self), self.evicted_count
+        result = super().extend(*args, **kwargs)
+        self._handle_appended(old_len, old_evicted_count)
+        return result
+
+    def insert(self, *args, **kwargs):
+        result = super().insert(*args, **kwargs)
+        self._handle_change()
+        return result
+
+    def remove(self, *args, **kwargs):
+        result = super().remove(*args, **kwargs)
+        self._handle_change()
+        return result
+
+    def pop(self, index=-1):
+        is_front = _is_front_index(index, len(self))
+        result = super().pop(index)
+        if is_front:
+            self._handle_change(dropped=1)
+        else:
+            self._handle_change()
+        return result
+
+    def clear(self, *args, **kwargs):
+        result = super().clear(*args, **kwargs)
+        self._handle_change()
+        return result
+
+    def sort(self, *args, **kwargs):
+        result = super().sort(*args, **kwargs)
+        self._handle_change()
+        return result
+
+    def reverse(self, *args, **kwargs):
+        result = super().reverse(*args, **kwargs)
+        self._handle_change()
+        return result
+
+    def __setitem__(self, *args, **kwargs):
+        result = super().__setitem__(*args, **kwargs)
+        self._handle_change()
+        return result
+
+    def __delitem__(self, index):
+        old_len = len(self)
+        result = super().__delitem__(index)
+        if _is_front_index(index, old_len):
+            self._handle_change(dropped=old_len - len(self))
+        else:
+            self._handle_change()
+        return result
+
+    def __iadd__(self, *args, **kwargs):
+        old_len, old_evicted_count = len(self), self.evicted_count
+        result = super().__iadd__(*args, **kwargs)
+        self._handle_appended(old_len, old_evicted_count)
+        return result
+
+    def __imul__(self, *args, **kwargs):
+        result = super().__imul__(*args, **kwargs)
+        self._handle_change()
+        return result
+
+
 class WrappedListDescriptor:
-    """Creates a list property that calls a callback function on edit"""
+    """Creates a list property that calls a callback function on edit
+
+    If `maxlen_name` is given and that attribute of the instance is not None, the list is
+    bounded to that many items and evicts the oldest ones when full. Evicted items are passed to
+    the method named `evict_name`, if given."""
 
-    def __init__(self, callback_name):
+    def __init__(self, callback_name, maxlen_name=None, evict_name=None):
         self.callback_name = callback_name
+        self.maxlen_name = maxlen_name
+        self.evict_name = evict_name
 
     def __set_name__(self, owner, name):
         self.private_name = '_' + name
+        self.callback_private_name = '_' + name + '_callback'
+
+    def _get_callback(self, instance):
+        # Every list assigned to this attribute shares the callback, so batches carry over
+        callback = getattr(instance, self.callback_private_name, None)
+        if callback is None:
+            callback = BatchedCallback(getattr(instance, self.callback_name, lambda: None))
+            setattr(instance, self.callback_private_name, callback)
+        return callback
+
+    def _wrap(self, instance, lst):
+        callback = self._get_callback(instance)
+        maxlen = getattr(instance, self.maxlen_name, None) if self.maxlen_name is not None else None
+        if maxlen is None:
+            return WrappedList(callback, lst)
+        on_evict = getattr(instance, self.evict_name) if self.evict_name is not None else None
+        return WrappedRingList(callback, lst, maxlen=maxlen, on_evict=on_evict)
 
     def __get__(self, instance, owner):
+        if instance is None:
+            return self
         cur_lst = getattr(instance, self.private_name, None)
-        if cur_lst is None:
-            callback = getattr(instance, self.callback_name, lambda: None)
-            new_lst = WrappedList(callback, [])
+        if not isinstance(cur_lst, (WrappedList, WrappedRingList)):
+            new_lst = self._wrap(instance, cur_lst or [])
             setattr(instance, self.private_name, new_lst)
             return new_lst
         return cur_lst
 
     def __set__(self, instance, new_lst):
         cur_lst = getattr(instance, self.private_name, None)
-        callback = getattr(instance, self.callback_name, lambda: None)
+        callback = self._get_callback(instance)
         if new_lst is not cur_lst:
-            setattr(instance, self.private_name, WrappedList(callback, new_lst))
+            setattr(instance, self.private_name, self._wrap(instance, new_lst))
         callback()
 
     def __delete__(self, instance):
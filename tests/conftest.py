@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The tests drive the console through the headless stand-ins used by the benchmarks
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'benchmarks'))
@@ -0,0 +1,75 @@
+import threading
+import time
+
+from headless import make_console
+from snapconsole import LogBackpressure
+from snapconsole.ingest import LogQueue, suppressed_line
+from snapconsole.snapconsole import POSTED_LOGS_IDLE_POLL_INTERVAL, default_log_splitter
+
+
+def blocked_queue(**kwargs):
+    queue = LogQueue(1, LogBackpressure.BLOCK, **kwargs)
+    # Posts from this thread stand in for posts from a producer thread
+    queue._drain_thread = None
+    queue.post('first')
+    return queue
+
+
+def test_posted_count_from_many_threads():
+    queue = LogQueue()
+    threads = [threading.Thread(target=lambda: [queue.post(i) for i in range(10000)]) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert queue.posted_count == 80000
+    assert len(queue.drain()) == 80000
+
+
+def test_posted_logs_polling_backs_off_when_idle():
+    console = make_console(10, 40, max_fps=60)
+    assert console._time_until_posted_logs(0) is None
+    console.post_log('posted')
+    assert console._time_until_posted_logs(console._drain_posted_logs()) == 1 / 60
+    waits = [console._time_until_posted_logs(console._drain_posted_logs()) for _ in range(10)]
+    assert waits == sorted(waits)
+    assert waits[-1] == POSTED_LOGS_IDLE_POLL_INTERVAL
+    console.post_log('posted again')
+    assert console._time_until_posted_logs(0) == 1 / 60
+
+
+def test_ui_thread_appends_are_coalesced_by_default():
+    console = make_console(10, 40)
+    for i in range(1000):
+        console.logs.append(f'log {i}')
+    for i in range(1000):
+        console.post_log(f'posted {i}')
+    console.flush()
+    assert console._redraw_scheduler.frames_drawn <= 3
+
+
+def test_close_wakes_blocked_post():
+    queue = blocked_queue()
+    thread = threading.Thread(target=queue.post, args=('second',))
+    thread.start()
+    time.sleep(0.05)
+    assert thread.is_alive()
+    queue.close()
+    thread.join(1)
+    assert not thread.is_alive()
+    queue.post('third')
+    assert queue.drain() == ['first']
+    assert queue.dropped_count == 2
+
+
+def test_block_timeout_drops_post():
+    queue = blocked_queue(block_timeout=0.01)
+    queue.post('second')
+    assert queue.drain() == ['first']
+    assert queue.blocked_count == 1
+    assert queue.dropped_count == 1
+
+
+def test_suppressed_line_is_drawn_as_is():
+    line = suppressed_line(1234)
+    assert default_log_splitter(line, 80) == [[line]]
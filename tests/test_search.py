@@ -0,0 +1,57 @@
+import curses.ascii
+
+from headless import make_console
+
+
+def type_keys(console, keys):
+    for key in keys:
+        console._handle_input_ch(ord(key) if isinstance(key, str) else key)
+
+
+def test_history_search_after_command_history_is_replaced():
+    console = make_console(10, 40, max_fps=None)
+    console.command_history = ['cmd %d' % i for i in range(20)]
+    type_keys(console, [curses.ascii.DC2, '1', curses.ascii.ESC])
+    console.command_history = ['mid']
+    console.command_history = []
+    console.command_history.append('other 9')
+    type_keys(console, [curses.ascii.DC2, '9'])
+    assert console._search.match == 0
+    type_keys(console, ['\n'])
+    assert console.current_command == 'other 9'
+
+
+def test_log_search_after_logs_are_replaced():
+    console = make_console(10, 40, max_fps=None)
+    console.logs = ['old %d' % i for i in range(20)]
+    type_keys(console, [curses.ascii.DC3, 'o', 'l', 'd', curses.ascii.ESC])
+    console.logs = ['mid']
+    console.logs = ['new %d' % i for i in range(5)]
+    console.logs.append('new 9')
+    type_keys(console, [curses.ascii.DC3, '9'])
+    assert console._search.match == 5
+    type_keys(console, [curses.ascii.DC3])
+    assert console._search.match == 5
+    type_keys(console, ['\n'])
+    console.flush()
+    assert console.hidden_log_count == 5
+
+
+def test_cancelled_log_search_restores_the_filter():
+    console = make_console(10, 40, max_fps=None)
+    console.logs = ['log %d' % i for i in range(20)]
+    console.set_log_filter('log 1')
+    log_filter = console._log_filter
+    type_keys(console, [curses.ascii.DC3, '5', curses.ascii.ESC])
+    assert console._log_filter is log_filter
+
+
+def test_cancelled_log_search_keeps_filter_set_during_search():
+    console = make_console(10, 40, max_fps=None)
+    console.logs = ['log %d' % i for i in range(20)]
+    type_keys(console, [curses.ascii.DC3, '1'])
+    console.set_log_filter('log 1[0-4]')
+    type_keys(console, ['2', curses.ascii.ESC])
+    console.flush()
+    assert console._log_search_query == ''
+    assert console.hidden_log_count == 15
@@ -0,0 +1,31 @@
+import curses
+import random
+
+from bench_splitter import legacy_log_splitter
+from snapconsole.snapconsole import default_log_splitter
+
+ALPHABET = 'abc xyz' * 4 + '\n\n\t\r\x00\x1b\x7féü中😀'
+
+
+def random_text(rng):
+    return ''.join(rng.choice(ALPHABET) for _ in range(rng.randint(0, 60)))
+
+
+def random_entry(rng):
+    if rng.random() < 0.3:
+        return random_text(rng)
+    entry = []
+    for _ in range(rng.randint(0, 6)):
+        if rng.random() < 0.4:
+            entry.append(rng.choice([curses.A_NORMAL, curses.A_BOLD, curses.A_UNDERLINE | curses.A_REVERSE]))
+        else:
+            entry.append(random_text(rng))
+    return entry
+
+
+def test_default_log_splitter_matches_legacy_splitter():
+    rng = random.Random(0)
+    for _ in range(20000):
+        entry = random_entry(rng)
+        col = rng.randint(1, 30)
+        assert default_log_splitter(entry, col) == legacy_log_splitter(entry, col), (entry, col)
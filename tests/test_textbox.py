@@ -0,0 +1,27 @@
+import curses
+
+from headless import make_console
+
+
+def type_keys(console, keys):
+    for key in keys:
+        console._handle_input_ch(ord(key) if isinstance(key, str) else key)
+
+
+def test_draft_is_kept_through_history_navigation():
+    console = make_console(10, 40, max_fps=None)
+    type_keys(console, 'old\n')
+    type_keys(console, 'draft')
+    type_keys(console, [curses.KEY_UP])
+    assert console.textpad.gather() == 'old'
+    type_keys(console, [curses.KEY_DOWN])
+    assert console.textpad.gather() == 'draft'
+    assert console._handle_input_ch(ord('\n')) == 'draft'
+
+
+def test_edited_draft_is_kept_through_history_navigation():
+    console = make_console(10, 40, max_fps=None)
+    type_keys(console, 'old\n')
+    type_keys(console, ['d', 'r', 'a', 'f', 't', 's', curses.KEY_BACKSPACE])
+    type_keys(console, [curses.KEY_UP, curses.KEY_DOWN])
+    assert console.current_command == 'draft'
@@ -0,0 +1,23 @@
+from headless import make_console
+
+
+def test_change_token_differs_for_replaced_lists():
+    console = make_console(10, 40, max_fps=None)
+    console.logs = ['old %d' % i for i in range(20)]
+    old_token = console.logs.change_token
+    # The list assigned in between is freed, so the next one can be given the same `id`
+    console.logs = ['mid']
+    console.logs = ['new %d' % i for i in range(20)]
+    assert console.logs.change_token[0] != old_token[0]
+
+
+def test_find_log_after_logs_are_replaced():
+    console = make_console(10, 40, max_fps=None)
+    console.logs = ['old %d' % i for i in range(20)]
+    assert console._find_log('old 5') == 5
+    console.logs = ['mid']
+    console.logs = ['new %d' % i for i in range(10)]
+    console.logs.extend(['new x'] * 5)
+    assert console._find_log('old 5') is None
+    assert console._find_log('new 5') == 5
+    assert console._find_log('new x') == 14